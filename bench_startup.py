@@ -0,0 +1,81 @@
+"""Measure how long server.py takes to import and to draw its first frame.
+
+Each run starts a fresh interpreter so import caches do not carry over.
+AWS calls are pointed at a closed local port, so nothing leaves the machine
+and the background inventory fetch fails fast.
+
+    python bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+IMPORT_TARGET = 0.4
+FIRST_FRAME_TARGET = 0.75
+
+CHILD = """
+import asyncio, os, sys, time
+start = time.perf_counter()
+import server
+imported = time.perf_counter() - start
+boto3_loaded = "boto3" in sys.modules
+
+async def main():
+    app = server.AwsStatusApp()
+    async with app.run_test():
+        first_frame = time.perf_counter() - start
+        print(imported, first_frame, boto3_loaded, flush=True)
+        os._exit(0)
+
+asyncio.run(main())
+"""
+
+
+def run_once(env):
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr.strip())
+    imported, first_frame, boto3_loaded = output.stdout.split()
+    return float(imported), float(first_frame), boto3_loaded == "True"
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            AWS_ACCESS_KEY_ID="bench",
+            AWS_SECRET_ACCESS_KEY="bench",
+            AWS_DEFAULT_REGION="us-east-1",
+            AWS_ENDPOINT_URL="http://127.0.0.1:9",
+            AWS_EC2_METADATA_DISABLED="true",
+            AWS_STATUS_REGIONS="us-east-1",
+            AWS_STATUS_API_MAX_ATTEMPTS="1",
+            AWS_STATUS_CACHE_PATH=os.path.join(tmp, "inventory.db"),
+        )
+        results = [run_once(env) for _ in range(runs)]
+
+    imported = statistics.median(result[0] for result in results)
+    first_frame = statistics.median(result[1] for result in results)
+    boto3_loaded = any(result[2] for result in results)
+
+    print(f"runs:        {runs}")
+    print(f"import:      {imported * 1000:.0f} ms (target {IMPORT_TARGET * 1000:.0f} ms)")
+    print(f"first frame: {first_frame * 1000:.0f} ms (target {FIRST_FRAME_TARGET * 1000:.0f} ms)")
+    print(f"boto3 imported by server.py: {'yes' if boto3_loaded else 'no'}")
+
+    if imported > IMPORT_TARGET or first_frame > FIRST_FRAME_TARGET or boto3_loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,1014 @@
-import boto3
+import asyncio
 import time
+import itertools
+import json
 import os
+import random
+import signal
+import sqlite3
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import partial, wraps
+from typing import NamedTuple
 from textual.app import App, ComposeResult
-from textual.containers import Grid
 from textual.screen import ModalScreen
-from textual.widgets import Button, Footer, Header, Label, Static, Input, Select
-from textual import on
+from textual.widgets import Button, DataTable, Footer, Header, Label, Log, Static, Input, Select
+from textual import on, work
+from textual.binding import Binding
+from textual.coordinate import Coordinate
+from textual.widgets.data_table import RowKey
+from textual.message import Message
 from textual.containers import VerticalScroll, Horizontal
 from textual.widgets import Button
 
-lightsail_client = boto3.client('lightsail')
-ec2_client = boto3.client('ec2')
+DEFAULT_ACCOUNT = "default"
+
+# Comma separated named profiles and/or role ARNs to inventory, e.g.
+# AWS_STATUS_PROFILES="dev,prod" AWS_STATUS_ROLE_ARNS="arn:aws:iam::123456789012:role/ReadOnly".
+# When both are unset only the default credentials are used.
+INVENTORY_PROFILES = [profile.strip() for profile in os.environ.get("AWS_STATUS_PROFILES", "").split(",") if profile.strip()]
+INVENTORY_ROLE_ARNS = [arn.strip() for arn in os.environ.get("AWS_STATUS_ROLE_ARNS", "").split(",") if arn.strip()]
+ACCOUNT_CONCURRENCY = int(os.environ.get("AWS_STATUS_ACCOUNT_CONCURRENCY", "8"))
+
+
+# Client-side throttling: every client for a (service, region) shares one
+# token bucket whose rate grows while calls succeed and halves whenever AWS
+# answers with a throttling error. botocore's adaptive retry mode then
+# retries the throttled call itself.
+API_INITIAL_RATE = float(os.environ.get("AWS_STATUS_API_RATE", "20"))
+API_MIN_RATE = 1.0
+API_MAX_RATE = float(os.environ.get("AWS_STATUS_API_MAX_RATE", "100"))
+API_RATE_INCREASE = 0.5
+API_MAX_ATTEMPTS = int(os.environ.get("AWS_STATUS_API_MAX_ATTEMPTS", "10"))
+THROTTLING_ERROR_CODES = {
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled",
+    "RequestThrottledException", "RequestLimitExceeded", "TooManyRequestsException", "SlowDown",
+}
+
+MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_STATUS_MAX_POOL_CONNECTIONS", "50"))
+
+CLIENT_CONFIG_OPTIONS = {
+    "retries": {"mode": "adaptive", "max_attempts": API_MAX_ATTEMPTS},
+    "max_pool_connections": MAX_POOL_CONNECTIONS,
+    "tcp_keepalive": True,
+}
+
+
+class TokenBucket:
+    def __init__(self, rate, min_rate, max_rate):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, **kwargs):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def record_response(self, response=None, **kwargs):
+        if response is None:
+            return
+        _, parsed = response
+        with self.lock:
+            if parsed.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, self.rate)
+            else:
+                self.rate = min(self.max_rate, self.rate + API_RATE_INCREASE)
+
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(service, region):
+    with rate_limiters_lock:
+        limiter = rate_limiters.get((service, region))
+        if limiter is None:
+            limiter = TokenBucket(API_INITIAL_RATE, API_MIN_RATE, API_MAX_RATE)
+            rate_limiters[(service, region)] = limiter
+        return limiter
+
+
+def attach_rate_limiter(client, service):
+    # before-send and needs-retry fire once per HTTP attempt, so retries
+    # spend tokens too and every throttled attempt slows the bucket down.
+    limiter = get_rate_limiter(service, client.meta.region_name)
+    client.meta.events.register("before-send", limiter.acquire)
+    client.meta.events.register("needs-retry", limiter.record_response)
+    return client
+
+
+class SessionPool:
+    def __init__(self, profiles, role_arns):
+        self.sources = {}
+        for profile in profiles:
+            self.sources[profile] = ("profile", profile)
+        for role_arn in role_arns:
+            self.sources[role_arn.split(":")[4]] = ("role", role_arn)
+        if not self.sources:
+            self.sources[DEFAULT_ACCOUNT] = ("default", None)
+
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    @property
+    def accounts(self):
+        return list(self.sources)
+
+    def session(self, account=None):
+        account = account or self.accounts[0]
+        with self.lock:
+            session = self.sessions.get(account)
+            if session is None:
+                session = self.create_session(*self.sources[account])
+                self.sessions[account] = session
+            return session
+
+    def create_session(self, kind, value):
+        import boto3
+
+        if kind == "profile":
+            return boto3.Session(profile_name=value)
+        if kind == "role":
+            return self.assume_role_session(value)
+        return boto3.Session()
+
+    def assume_role_session(self, role_arn):
+        # The STS credentials are cached by botocore and only re-assumed
+        # shortly before they expire, so refreshes reuse the same session.
+        import boto3
+        import botocore.session
+        from botocore.credentials import DeferredRefreshableCredentials
+
+        sts_client = boto3.Session().client("sts")
+
+        def refresh():
+            credentials = sts_client.assume_role(
+                RoleArn=role_arn, RoleSessionName="aws-status-app"
+            )["Credentials"]
+            return {
+                "access_key": credentials["AccessKeyId"],
+                "secret_key": credentials["SecretAccessKey"],
+                "token": credentials["SessionToken"],
+                "expiry_time": credentials["Expiration"].isoformat(),
+            }
+
+        botocore_session = botocore.session.get_session()
+        botocore_session._credentials = DeferredRefreshableCredentials(
+            refresh_using=refresh, method="sts-assume-role"
+        )
+        return boto3.Session(botocore_session=botocore_session)
+
+
+class ClientRegistry:
+    # botocore clients are thread-safe once built, so every worker shares
+    # one client per (account, region, service) and reuses its warm HTTPS
+    # connection pool. Sessions are not thread-safe, so clients for the
+    # same account are built one at a time.
+    def __init__(self, sessions, config_options):
+        self.sessions = sessions
+        self.config_options = config_options
+        self.config = None
+        self.clients = {}
+        self.account_locks = {}
+        self.lock = threading.Lock()
+
+    def client(self, service, region=None, account=None):
+        account = account or self.sessions.accounts[0]
+        key = (account, region, service)
+        client = self.clients.get(key)
+        if client is not None:
+            return client
+
+        with self.lock:
+            account_lock = self.account_locks.setdefault(account, threading.Lock())
+        with account_lock:
+            client = self.clients.get(key)
+            if client is None:
+                if self.config is None:
+                    from botocore.config import Config
+
+                    self.config = Config(**self.config_options)
+                client = self.sessions.session(account).client(service, region_name=region, config=self.config)
+                attach_rate_limiter(client, service)
+                self.clients[key] = client
+        return client
+
+
+session_pool = SessionPool(INVENTORY_PROFILES, INVENTORY_ROLE_ARNS)
+client_registry = ClientRegistry(session_pool, CLIENT_CONFIG_OPTIONS)
+
+
+def default_region():
+    # boto3 and the AWS config files are only loaded once something needs
+    # a client, which keeps them off the path to the first frame.
+    return session_pool.session().region_name
+
+
+def get_client(service, region=None, account=None):
+    return client_registry.client(service, region or default_region(), account)
+
+EC2_PAGE_SIZE = 200
+
+INVENTORY_SOURCES = ("ec2", "lightsail", "databases")
 
-LIGHTSAIL_INSTANCES = []
-LIGHTSAIL_DATABASES = []
-EC2_INSTANCES = []
+# Comma separated list of regions to scan, e.g. "us-east-1,ap-south-1".
+# When unset every region enabled for the account is scanned.
+INVENTORY_REGIONS = [region.strip() for region in os.environ.get("AWS_STATUS_REGIONS", "").split(",") if region.strip()]
+REGION_CONCURRENCY = int(os.environ.get("AWS_STATUS_REGION_CONCURRENCY", "24"))
 
-def fetch_running_ec2_instances():
-    global EC2_INSTANCES
-    response = ec2_client.describe_instances(
-        Filters=[{'Name': 'instance-state-name', 'Values': ['running', 'stopped']}]
+enabled_regions = {}
+
+
+def fetch_enabled_regions(service, account=None):
+    if INVENTORY_REGIONS:
+        return list(INVENTORY_REGIONS)
+    account = account or session_pool.accounts[0]
+    if (account, service) in enabled_regions:
+        return enabled_regions[(account, service)]
+
+    response = get_client('ec2', account=account).describe_regions(
+        Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+    )
+    regions = [region['RegionName'] for region in response['Regions']]
+    if service == "lightsail":
+        lightsail_regions = {region['name'] for region in get_client('lightsail', account=account).get_regions()['regions']}
+        regions = [region for region in regions if region in lightsail_regions]
+
+    enabled_regions[(account, service)] = regions
+    return regions
+
+
+class RecordKey(NamedTuple):
+    # Lightsail resources are identified by name, and names are only
+    # unique within one account and region, so records are keyed by all
+    # four. str() gives the bare id for messages and labels. DataTable only
+    # looks up plain strings by value, so table calls wrap these in RowKey.
+    account: str
+    region: str
+    kind: str
+    id: str
+
+    def __str__(self):
+        return self.id
+
+
+@dataclass(slots=True)
+class InstanceRecord:
+    id: str
+    name: str
+    state: str
+    kind: str
+    region: str
+    account: str
+    public_ip: str = 'N/A'
+    private_ip: str = 'N/A'
+    tags: dict = field(default_factory=dict)
+    instance_type: str = 'N/A'
+    availability_zone: str = 'N/A'
+    launch_time: str = 'N/A'
+    vpc_id: str = 'N/A'
+    security_groups: tuple = ()
+
+    @property
+    def key(self):
+        return RecordKey(self.account, self.region, self.kind, self.id)
+
+
+INSTANCE_STATES = ("running", "stopped", "pending", "stopping", "terminated", "available")
+
+
+@dataclass(slots=True)
+class InventoryFilter:
+    state: str = ""
+    tag_key: str = ""
+    tag_value: str = ""
+    instance_type: str = ""
+    name_prefix: str = ""
+    vpc_id: str = ""
+
+    @property
+    def active(self):
+        return any(getattr(self, name) for name in self.__slots__)
+
+    def ec2_filters(self):
+        # EC2 applies these server side, so narrow views only transfer
+        # and parse the matching instances.
+        filters = [{'Name': 'instance-state-name', 'Values': [self.state] if self.state else ['running', 'stopped']}]
+        if self.tag_key and self.tag_value:
+            filters.append({'Name': f'tag:{self.tag_key}', 'Values': [self.tag_value]})
+        elif self.tag_key:
+            filters.append({'Name': 'tag-key', 'Values': [self.tag_key]})
+        if self.instance_type:
+            filters.append({'Name': 'instance-type', 'Values': [self.instance_type]})
+        if self.name_prefix:
+            filters.append({'Name': 'tag:Name', 'Values': [f'{self.name_prefix}*']})
+        if self.vpc_id:
+            filters.append({'Name': 'vpc-id', 'Values': [self.vpc_id]})
+        return filters
+
+    def matches(self, record):
+        # Lightsail has no server-side filters, so its pages are filtered
+        # here as they stream in.
+        if self.state and record.state != self.state:
+            return False
+        if self.tag_key and self.tag_key not in record.tags:
+            return False
+        if self.tag_key and self.tag_value and record.tags.get(self.tag_key) != self.tag_value:
+            return False
+        if self.instance_type and record.instance_type != self.instance_type:
+            return False
+        if self.name_prefix and not record.name.startswith(self.name_prefix):
+            return False
+        if self.vpc_id and record.vpc_id != self.vpc_id:
+            return False
+        return True
+
+
+def ec2_record(instance, region, account):
+    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+    return InstanceRecord(
+        id=instance['InstanceId'],
+        name=tags.get('Name', 'N/A'),
+        state=instance['State']['Name'],
+        kind="ec2",
+        region=region,
+        account=account,
+        public_ip=instance.get('PublicIpAddress', 'N/A'),
+        private_ip=instance.get('PrivateIpAddress', 'N/A'),
+        tags=tags,
+        instance_type=instance.get('InstanceType', 'N/A'),
+        availability_zone=instance.get('Placement', {}).get('AvailabilityZone', 'N/A'),
+        launch_time=instance['LaunchTime'].isoformat() if 'LaunchTime' in instance else 'N/A',
+        vpc_id=instance.get('VpcId', 'N/A'),
+        security_groups=tuple(sg['GroupId'] for sg in instance.get('SecurityGroups', [])),
     )
-    instances = []
-    for reservation in response['Reservations']:
-        for instance in reservation['Instances']:
-            instance_id = instance['InstanceId']
-            instance_state = instance['State']['Name']
-            name = next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == 'Name'), 'N/A')
-            public_ip = instance.get('PublicIpAddress', 'N/A')
-            tags = [tag['Key'] for tag in instance.get('Tags', [])]
-            instances.append((instance_id, name, instance_state, public_ip, tags))
-    return instances
-
-
-def fetch_lightsail_instances():
-    global LIGHTSAIL_INSTANCES
-    response = lightsail_client.get_instances()
-    instances = []
-    instance_names = []
-    for instance in response['instances']:
-        instance_name = instance['name']
-        instance_state = instance['state']['name']
-        public_ip = instance['publicIpAddress'] if 'publicIpAddress' in instance else 'N/A'
-        tags = [tag.get('key') for tag in instance.get('tags', []) if 'key' in tag] 
-        instances.append((instance_name, instance_name, instance_state, public_ip, tags))
-        instance_names.append(instance_name)
-    return instances, instance_names
-
-
-def fetch_lightsail_databases():
-    response = lightsail_client.get_relational_databases()
-    instances = []
-    db_names = []
-    for db_instance in response['relationalDatabases']:
-        db_instance_id = db_instance['name']
-        db_instance_state = db_instance['state']
-        tags = [tag.get('key') for tag in db_instance.get('tags', []) if 'key' in tag]
-        instances.append((db_instance_id, db_instance_id, db_instance_state, 'N/A', tags))
-        db_names.append(db_instance_id)
-    return instances, db_names
+
+
+def lightsail_record(instance, region, account):
+    return InstanceRecord(
+        id=instance['name'],
+        name=instance['name'],
+        state=instance['state']['name'],
+        kind="lightsail",
+        region=region,
+        account=account,
+        public_ip=instance.get('publicIpAddress', 'N/A'),
+        private_ip=instance.get('privateIpAddress', 'N/A'),
+        tags={tag['key']: tag.get('value', '') for tag in instance.get('tags', []) if 'key' in tag},
+        instance_type=instance.get('bundleId', 'N/A'),
+        availability_zone=instance.get('location', {}).get('availabilityZone', 'N/A'),
+        launch_time=instance['createdAt'].isoformat() if 'createdAt' in instance else 'N/A',
+    )
+
+
+def database_record(db_instance, region, account):
+    return InstanceRecord(
+        id=db_instance['name'],
+        name=db_instance['name'],
+        state=db_instance['state'],
+        kind="databases",
+        region=region,
+        account=account,
+        tags={tag['key']: tag.get('value', '') for tag in db_instance.get('tags', []) if 'key' in tag},
+        instance_type=db_instance.get('relationalDatabaseBundleId', 'N/A'),
+        availability_zone=db_instance.get('location', {}).get('availabilityZone', 'N/A'),
+        launch_time=db_instance['createdAt'].isoformat() if 'createdAt' in db_instance else 'N/A',
+    )
+
+
+def fetch_running_ec2_instances(region=None, account=None, inventory_filter=None):
+    account = account or session_pool.accounts[0]
+    client = get_client('ec2', region, account)
+    region = client.meta.region_name
+    paginator = client.get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=(inventory_filter or InventoryFilter()).ec2_filters(),
+        PaginationConfig={'PageSize': EC2_PAGE_SIZE},
+    )
+    for response in pages:
+        yield [
+            ec2_record(instance, region, account)
+            for reservation in response['Reservations']
+            for instance in reservation['Instances']
+        ]
+
+
+def fetch_lightsail_instances(region=None, account=None):
+    account = account or session_pool.accounts[0]
+    client = get_client('lightsail', region, account)
+    region = client.meta.region_name
+    paginator = client.get_paginator('get_instances')
+    for response in paginator.paginate():
+        yield [lightsail_record(instance, region, account) for instance in response['instances']]
+
+
+def fetch_lightsail_databases(region=None, account=None):
+    account = account or session_pool.accounts[0]
+    client = get_client('lightsail', region, account)
+    region = client.meta.region_name
+    paginator = client.get_paginator('get_relational_databases')
+    for response in paginator.paginate():
+        yield [database_record(db_instance, region, account) for db_instance in response['relationalDatabases']]
+
+
+INVENTORY_CACHE_PATH = os.environ.get(
+    "AWS_STATUS_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "aws_status", "inventory.db"),
+)
+INVENTORY_CACHE_TTL = int(os.environ.get("AWS_STATUS_CACHE_TTL", "3600"))
+
+
+def open_inventory_cache():
+    os.makedirs(os.path.dirname(INVENTORY_CACHE_PATH), exist_ok=True)
+    connection = sqlite3.connect(INVENTORY_CACHE_PATH)
+    connection.execute("CREATE TABLE IF NOT EXISTS records (source TEXT, record TEXT)")
+    connection.execute("CREATE TABLE IF NOT EXISTS snapshot (saved_at REAL)")
+    return connection
+
+
+def load_inventory_cache():
+    connection = open_inventory_cache()
+    try:
+        row = connection.execute("SELECT saved_at FROM snapshot").fetchone()
+        if row is None or time.time() - row[0] > INVENTORY_CACHE_TTL:
+            return None
+
+        parts = {source: [] for source in INVENTORY_SOURCES}
+        rows = connection.execute("SELECT source, record FROM records ORDER BY rowid")
+        for source, record in rows:
+            if source in parts:
+                record = json.loads(record)
+                record["security_groups"] = tuple(record["security_groups"])
+                parts[source].append(InstanceRecord(**record))
+        return row[0], parts
+    finally:
+        connection.close()
+
+
+def save_inventory_cache(parts):
+    connection = open_inventory_cache()
+    try:
+        with connection:
+            connection.execute("DELETE FROM records")
+            connection.executemany(
+                "INSERT INTO records VALUES (?, ?)",
+                [
+                    (source, json.dumps(asdict(record)))
+                    for source in INVENTORY_SOURCES
+                    for record in parts[source]
+                ],
+            )
+            connection.execute("DELETE FROM snapshot")
+            connection.execute("INSERT INTO snapshot VALUES (?)", (time.time(),))
+    finally:
+        connection.close()
+
+
+class InventorySnapshot:
+    def __init__(self, parts):
+        self.records = []
+        self.by_key = {}
+        self.by_name = {}
+        self.by_ip = {}
+        self.by_kind = {source: [] for source in INVENTORY_SOURCES}
+        self.by_tag = {}
+
+        for source in INVENTORY_SOURCES:
+            for record in parts.get(source, ()):
+                key = record.key
+                if key in self.by_key:
+                    continue
+                self.records.append(record)
+                self.by_key[key] = record
+                self.by_kind[record.kind].append(record)
+                self.by_name.setdefault(record.name, record)
+                if record.public_ip != 'N/A':
+                    self.by_ip[record.public_ip] = record
+                for tag in record.tags:
+                    self.by_tag.setdefault(tag, []).append(record)
+
+    def changes_since(self, previous):
+        changed = [record for record in self.records if previous.by_key.get(record.key) != record]
+        removed = previous.by_key.keys() - self.by_key.keys()
+        return changed, removed
+
+
+class InventoryStore:
+    # Readers always see one complete snapshot: a refresh builds a new
+    # InventorySnapshot with all of its indexes and swaps it in at once.
+    def __init__(self):
+        self.snapshot = InventorySnapshot({})
+
+    def replace(self, parts):
+        self.snapshot = InventorySnapshot(parts)
+        return self.snapshot
+
+    @property
+    def records(self):
+        return self.snapshot.records
+
+    def get(self, key):
+        return self.snapshot.by_key.get(key)
+
+    def by_ip(self, public_ip):
+        return self.snapshot.by_ip.get(public_ip)
+
+    def by_kind(self, kind):
+        return self.snapshot.by_kind.get(kind, [])
+
+    def by_tag(self, tag_key):
+        return self.snapshot.by_tag.get(tag_key, [])
+
+    def update_record(self, record):
+        # Polled records are copied into the existing object, like tag
+        # updates, so the snapshot and its indexes keep a single record.
+        snapshot = self.snapshot
+        current = snapshot.by_key.get(record.key)
+        if current is None:
+            return None
+
+        if snapshot.by_ip.get(current.public_ip) is current:
+            del snapshot.by_ip[current.public_ip]
+        for name in record.__slots__:
+            setattr(current, name, getattr(record, name))
+        if current.public_ip != 'N/A':
+            snapshot.by_ip[current.public_ip] = current
+        return current
+
+    def update_tags(self, key, tags):
+        # Applied in place after our own tag calls succeed, so the tag index
+        # stays current without waiting for the next full fetch.
+        snapshot = self.snapshot
+        record = snapshot.by_key.get(key)
+        if record is None:
+            return None
+
+        record.tags = {**record.tags, **tags}
+        if record.kind == "ec2" and "Name" in tags:
+            record.name = tags["Name"]
+            snapshot.by_name.setdefault(record.name, record)
+        for tag_key in tags:
+            tagged = snapshot.by_tag.setdefault(tag_key, [])
+            if not any(existing is record for existing in tagged):
+                tagged.append(record)
+        return record
+
+
+def search_tokens(record):
+    values = [record.id, record.name, record.public_ip, record.private_ip, *record.tags, *record.tags.values()]
+    return {token for value in values if value and value != 'N/A' for token in value.lower().split()}
+
+
+class SearchIndex:
+    # One flat lowercase text per record. Scanning 20k of them takes a
+    # couple of milliseconds, far less than building trigram postings over
+    # random instance ids would, and typing forward only rescans the
+    # previous matches. Records are indexed as their pages arrive.
+    def __init__(self):
+        self.records = {}
+        self.entries = {}
+        self.last_query = ""
+        self.last_matches = None
+
+    def update(self, records):
+        for record in records:
+            if self.records.get(record.key) is not record:
+                self.reindex(record)
+
+    def reindex(self, record):
+        key = record.key
+        self.records[key] = record
+        self.entries[key] = (key, "\n".join(search_tokens(record)))
+        self.last_matches = None
+
+    def retain(self, keys):
+        removed = self.records.keys() - keys
+        for key in removed:
+            del self.records[key]
+            del self.entries[key]
+        if removed:
+            self.last_matches = None
+
+    def search(self, query):
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            return set(self.entries)
+
+        if self.last_matches is not None and self.last_query and query.startswith(self.last_query):
+            candidates = self.last_matches
+        else:
+            candidates = self.entries.values()
+        matches = [entry for entry in candidates if terms[0] in entry[1]]
+        for term in terms[1:]:
+            matches = [entry for entry in matches if term in entry[1]]
+        self.last_query = query
+        self.last_matches = matches
+        return {key for key, _ in matches}
+
+
+ADDRESS_CACHE_TTL = int(os.environ.get("AWS_STATUS_ADDRESS_CACHE_TTL", "300"))
+
+
+@dataclass(slots=True)
+class AddressRecord:
+    ip: str
+    name: str
+    instance_id: str = None
+    association_id: str = None
+
+
+def fetch_elastic_ips(region=None, account=None):
+    response = get_client("ec2", region, account).describe_addresses()
+    return [
+        AddressRecord(
+            ip=address["PublicIp"],
+            name=address.get("AllocationId", address["PublicIp"]),
+            instance_id=address.get("InstanceId"),
+            association_id=address.get("AssociationId"),
+        )
+        for address in response.get("Addresses", [])
+    ]
+
+
+def fetch_static_ips(region=None, account=None):
+    paginator = get_client("lightsail", region, account).get_paginator("get_static_ips")
+    return [
+        AddressRecord(
+            ip=static_ip["ipAddress"],
+            name=static_ip["name"],
+            instance_id=static_ip.get("attachedTo") if static_ip.get("isAttached", True) else None,
+        )
+        for page in paginator.paginate()
+        for static_ip in page.get("staticIps", [])
+    ]
+
+
+ADDRESS_FETCHERS = {"ec2": fetch_elastic_ips, "lightsail": fetch_static_ips}
+
+
+class AddressSnapshot:
+    def __init__(self, addresses):
+        self.loaded_at = time.monotonic()
+        self.by_ip = {}
+        self.by_name = {}
+        self.by_instance = {}
+        self.free = []
+
+        for address in addresses:
+            self.by_ip[address.ip] = address
+            self.by_name[address.name] = address
+            if address.instance_id:
+                self.by_instance.setdefault(address.instance_id, []).append(address)
+            else:
+                self.free.append(address)
+
+
+class AddressIndex:
+    # Elastic IPs and Static IPs are listed once per (service, region,
+    # account) and answered from memory until the TTL runs out or one of
+    # our own allocate/attach/detach calls invalidates that listing.
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.snapshots = {}
+        self.lock = threading.Lock()
+
+    def snapshot(self, service, region=None, account=None):
+        key = (service, region, account)
+        snapshot = self.snapshots.get(key)
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > self.ttl:
+            snapshot = AddressSnapshot(ADDRESS_FETCHERS[service](region, account))
+            with self.lock:
+                self.snapshots[key] = snapshot
+        return snapshot
+
+    def invalidate(self, service, region=None, account=None):
+        with self.lock:
+            self.snapshots.pop((service, region, account), None)
+
+    def by_ip(self, service, ip, region=None, account=None):
+        return self.snapshot(service, region, account).by_ip.get(ip)
+
+    def by_name(self, service, name, region=None, account=None):
+        return self.snapshot(service, region, account).by_name.get(name)
+
+    def by_instance(self, service, instance_id, region=None, account=None):
+        return self.snapshot(service, region, account).by_instance.get(instance_id, [])
+
+    def free(self, service, region=None, account=None):
+        return self.snapshot(service, region, account).free
+
+
+class SecurityGroupCache:
+    # Inventory records already carry their security groups. Anything the
+    # inventory does not know is looked up with one describe_instances per
+    # region and remembered until the next inventory refresh.
+    def __init__(self, inventory):
+        self.inventory = inventory
+        self.groups = {}
+        self.lock = threading.Lock()
+
+    def groups_for(self, keys, region, account):
+        groups = {}
+        missing = []
+        for key in keys:
+            instance = self.inventory.get(key)
+            if instance and instance.security_groups:
+                groups[key] = instance.security_groups
+            elif key in self.groups:
+                groups[key] = self.groups[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            paginator = get_client("ec2", region, account).get_paginator("describe_instances")
+            found = {}
+            for page in paginator.paginate(InstanceIds=[key.id for key in missing]):
+                for reservation in page["Reservations"]:
+                    for instance in reservation["Instances"]:
+                        key = RecordKey(account, region, "ec2", instance["InstanceId"])
+                        found[key] = tuple(sg["GroupId"] for sg in instance.get("SecurityGroups", []))
+            with self.lock:
+                self.groups.update(found)
+            groups.update(found)
+        return groups
+
+    def clear(self):
+        with self.lock:
+            self.groups.clear()
+
+
+OPERATION_POLL_INTERVAL = 2.0
+OPERATION_MAX_POLL_INTERVAL = 30.0
+OPERATION_DONE_STATUSES = ("Succeeded", "Completed", "Failed")
+
+
+class OperationTracker:
+    # Polls pending Lightsail operations on one background thread. Every
+    # cycle checks each pending operation with a targeted get_operation
+    # call and backs off while nothing finishes.
+    def __init__(self, app):
+        self.app = app
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.polling = False
+
+    def track(self, client, operation_id, callback):
+        with self.lock:
+            self.pending[operation_id] = (client, callback)
+            start = not self.polling
+            self.polling = True
+        self.wakeup.set()
+        if start:
+            threading.Thread(target=self.poll, name="operation-tracker", daemon=True).start()
+
+    def poll(self):
+        interval = OPERATION_POLL_INTERVAL
+        while True:
+            if self.wakeup.wait(interval):
+                self.wakeup.clear()
+                interval = OPERATION_POLL_INTERVAL
+                time.sleep(interval)
+
+            with self.lock:
+                batch = list(self.pending.items())
+                if not batch:
+                    self.polling = False
+                    return
+
+            finished = False
+            for operation_id, (client, callback) in batch:
+                try:
+                    status = client.get_operation(operationId=operation_id)['operation']['status']
+                    error = None
+                except Exception as e:
+                    status, error = "Failed", str(e)
+
+                if status in OPERATION_DONE_STATUSES:
+                    finished = True
+                    with self.lock:
+                        self.pending.pop(operation_id, None)
+                    self.app.call_from_thread(callback, status, error)
+
+            interval = OPERATION_POLL_INTERVAL if finished else min(interval * 2, OPERATION_MAX_POLL_INTERVAL)
+
+
+SETTLED_STATES = ("running", "stopped", "terminated", "available")
+HOT_POLL_INTERVAL = float(os.environ.get("AWS_STATUS_HOT_POLL_INTERVAL", "3"))
+HOT_POLL_MAX_INTERVAL = 15.0
+HOT_POLL_TIMEOUT = 900.0
+
+
+class HotSetTracker:
+    # Instances in a transitional state are polled on their own at a short
+    # interval, grouped into one describe_instances per region for EC2 and
+    # one get_instance/get_relational_database per Lightsail resource. Each
+    # one leaves the hot set once it reaches a settled state and goes back
+    # to the regular refresh cadence.
+    def __init__(self, app):
+        self.app = app
+        self.hot = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.polling = False
+
+    def track(self, record, targets=SETTLED_STATES):
+        with self.lock:
+            self.hot[record.key] = (targets, time.monotonic() + HOT_POLL_TIMEOUT)
+            start = not self.polling
+            self.polling = True
+        self.wakeup.set()
+        if start:
+            threading.Thread(target=self.poll, name="hot-set-tracker", daemon=True).start()
+
+    def poll(self):
+        interval = HOT_POLL_INTERVAL
+        while True:
+            if self.wakeup.wait(interval):
+                self.wakeup.clear()
+                interval = HOT_POLL_INTERVAL
+                time.sleep(interval)
+
+            now = time.monotonic()
+            with self.lock:
+                for key in [key for key, entry in self.hot.items() if entry[1] < now]:
+                    del self.hot[key]
+                if not self.hot:
+                    self.polling = False
+                    return
+                groups = {}
+                for key in self.hot:
+                    groups.setdefault((key.kind, key.region, key.account), []).append(key.id)
+
+            records = []
+            for (kind, region, account), instance_ids in groups.items():
+                try:
+                    records.extend(self.describe(kind, region, account, instance_ids))
+                except Exception as e:
+                    records.extend(self.describe_each(kind, region, account, instance_ids, e))
+
+            settled = False
+            with self.lock:
+                for record in records:
+                    entry = self.hot.get(record.key)
+                    if entry is not None and record.state in entry[0]:
+                        del self.hot[record.key]
+                        settled = True
+            if records:
+                self.app.call_from_thread(self.app.apply_polled_records, records)
+
+            interval = HOT_POLL_INTERVAL if settled else min(interval * 1.5, HOT_POLL_MAX_INTERVAL)
+
+    def describe_each(self, kind, region, account, instance_ids, error):
+        # One id the API rejects (a terminated instance, say) fails the whole
+        # group, so retry one by one. Ids that still fail leave the hot set
+        # instead of blocking the rest of their region until the timeout.
+        records = []
+        failed = {}
+        if len(instance_ids) == 1:
+            failed[instance_ids[0]] = str(error)
+        else:
+            for instance_id in instance_ids:
+                try:
+                    records.extend(self.describe(kind, region, account, [instance_id]))
+                except Exception as e:
+                    failed[instance_id] = str(e)
+
+        by_error = {}
+        with self.lock:
+            for instance_id, message in failed.items():
+                self.hot.pop(RecordKey(account, region, kind, instance_id), None)
+                by_error.setdefault(message, []).append(instance_id)
+        for message, failed_ids in by_error.items():
+            self.app.notify(f"Stopped polling {', '.join(failed_ids)} in {region}: {message}")
+        return records
+
+    def describe(self, kind, region, account, instance_ids):
+        if kind == "ec2":
+            paginator = get_client("ec2", region, account).get_paginator("describe_instances")
+            return [
+                ec2_record(instance, region, account)
+                for page in paginator.paginate(InstanceIds=instance_ids)
+                for reservation in page["Reservations"]
+                for instance in reservation["Instances"]
+            ]
+
+        lightsail_client = get_client("lightsail", region, account)
+        if kind == "lightsail":
+            return [
+                lightsail_record(lightsail_client.get_instance(instanceName=name)["instance"], region, account)
+                for name in instance_ids
+            ]
+        return [
+            database_record(
+                lightsail_client.get_relational_database(relationalDatabaseName=name)["relationalDatabase"],
+                region, account,
+            )
+            for name in instance_ids
+        ]
+
+
+JOB_SERVICE_LIMITS = {
+    "ec2": int(os.environ.get("AWS_STATUS_EC2_JOB_LIMIT", "8")),
+    "lightsail": int(os.environ.get("AWS_STATUS_LIGHTSAIL_JOB_LIMIT", "4")),
+}
+JOBS_PANEL_LIMIT = 200
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    service: str
+    description: str
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: float = None
+    finished_at: float = None
+    error: str = None
+
+    @property
+    def waited(self):
+        return (self.started_at or time.monotonic()) - self.submitted_at
+
+    @property
+    def ran(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+
+class JobUpdated(Message):
+    def __init__(self, job: Job) -> None:
+        super().__init__()
+        self.job = job
+
+
+class JobQueue:
+    # Each service gets its own bounded pool, so a burst of slow Lightsail
+    # calls never holds up EC2 jobs queued behind it.
+    def __init__(self, app, service_limits):
+        self.app = app
+        self.executors = {
+            service: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{service}-job")
+            for service, limit in service_limits.items()
+        }
+        self.ids = itertools.count(1)
+        self.active = {}
+
+    def submit(self, service, description, fn, *args):
+        job = Job(next(self.ids), service, description)
+        self.active[job.id] = job
+        self.app.post_message(JobUpdated(job))
+        self.executors[service].submit(self.run, job, fn, args)
+        return job
+
+    def run(self, job, fn, args):
+        job.status = "running"
+        job.started_at = time.monotonic()
+        self.app.post_message(JobUpdated(job))
+        try:
+            fn(*args)
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = time.monotonic()
+            self.active.pop(job.id, None)
+            self.app.post_message(JobUpdated(job))
+
+
+def background_job(action):
+    # Turns a blocking AwsStatusApp action into an awaitable that queues
+    # it on the app's JobQueue and returns straight away.
+    def decorator(method):
+        @wraps(method)
+        async def submit(self, key, *args):
+            service = "ec2" if key.kind == "ec2" else "lightsail"
+            return self.jobs.submit(service, f"{action} {key.id}", method, self, key, *args)
+
+        return submit
+    return decorator
+
 
 def check_instance_ports(self, instance_name):
     try:
-        response = self.lightsail_client.get_instance(instanceName=instance_name)
+        response = get_client('lightsail').get_instance(instanceName=instance_name)
         public_ports = response['instance']['publicPorts']
         
         print(f"Current public ports for {instance_name}: {public_ports}")
@@ -73,7 +1018,7 @@ def check_instance_ports(self, instance_name):
         
 def check_lightsail_ports(self, instance_name):
     try:
-        response = self.lightsail_client.get_instance(instanceName=instance_name)
+        response = get_client('lightsail').get_instance(instanceName=instance_name)
         public_ports = response['instance']['publicPorts']
         print(f"Current public ports for {instance_name}: {public_ports}")
         return public_ports
@@ -239,7 +1184,11 @@ class ConfirmationModal(ModalScreen):
         self.apply_action_callback = apply_action_callback
 
     def compose(self) -> ComposeResult:
-        yield Label(f"Are you sure you want to {self.action} instance {self.instance_id}?", id="confirm-label")
+        if isinstance(self.instance_id, list):
+            target = f"{len(self.instance_id)} selected instances"
+        else:
+            target = f"instance {self.instance_id}"
+        yield Label(f"Are you sure you want to {self.action} {target}?", id="confirm-label")
         yield Button(f"Yes, {self.action}", id="confirm-yes-button", classes="button-show-all")
         yield Button("No, cancel", id="confirm-no-button", classes="button-launch-instance")
 
@@ -272,7 +1221,253 @@ class TagModal(ModalScreen):
             self.dismiss()
         elif event.button.id == "cancel-tag-button":
             self.dismiss()
+
+
+def parse_ports(value):
+    ports = []
+    for part in value.replace(" ", "").split(","):
+        if not part.isdigit() or not 0 < int(part) < 65536:
+            return None
+        ports.append(int(part))
+    return sorted(set(ports))
+
+
+def parse_tags(value):
+    tags = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        key, _, tag_value = pair.partition("=")
+        if not key.strip():
+            return None
+        tags[key.strip()] = tag_value.strip()
+    return tags
+
+
+class BulkTagModal(ModalScreen):
+    def __init__(self, instance_ids, apply_tags_callback):
+        super().__init__()
+        self.instance_ids = instance_ids
+        self.apply_tags_callback = apply_tags_callback
+
+    def compose(self) -> ComposeResult:
+        yield Label(f"Tag {len(self.instance_ids)} selected instances", id="bulk-tag-label")
+        self.tags_input = Input(placeholder="Enter tags (e.g., env=prod, team=web)", id="bulk-tags-input")
+        yield self.tags_input
+        yield Button("Apply", id="apply-tags-button", classes="button-show-all")
+        yield Button("Cancel", id="cancel-tags-button", classes="button-launch-instance")
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "apply-tags-button":
+            tags = parse_tags(self.tags_input.value)
+            if not tags:
+                self.notify("Invalid tags. Please enter key=value pairs separated by commas.")
+                return
+            await self.apply_tags_callback(self.instance_ids, tags)
+            self.dismiss()
+        elif event.button.id == "cancel-tags-button":
+            self.dismiss()
+
+
+class PortModal(ModalScreen):
+    def __init__(self, instance_ids, open_ports_callback):
+        super().__init__()
+        self.instance_ids = instance_ids
+        self.open_ports_callback = open_ports_callback
+
+    def compose(self) -> ComposeResult:
+        if len(self.instance_ids) > 1:
+            target = f"{len(self.instance_ids)} selected instances"
+        else:
+            target = f"instance {self.instance_ids[0]}"
+        yield Label(f"Open ports on {target}", id="port-label")
+        self.port_input = Input(placeholder="Enter ports (e.g., 80, 443)", id="ports-input")
+        yield self.port_input
+        yield Button("Open", id="open-ports-button", classes="button-show-all")
+        yield Button("Cancel", id="cancel-ports-button", classes="button-launch-instance")
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "open-ports-button":
+            ports = parse_ports(self.port_input.value)
+            if not ports:
+                self.notify("Invalid port value. Please enter numbers separated by commas.")
+                return
+            await self.open_ports_callback(self.instance_ids, ports)
+            self.dismiss()
+        elif event.button.id == "cancel-ports-button":
+            self.dismiss()
             
+SSH_KEY_PATH = os.environ.get("AWS_STATUS_SSH_KEY", "/Users/vgts/Desktop/AWS_UI/demo.pem")
+SSH_USER = os.environ.get("AWS_STATUS_SSH_USER", "ubuntu")
+SSH_CONCURRENCY = int(os.environ.get("AWS_STATUS_SSH_CONCURRENCY", "32"))
+SSH_CONNECT_TIMEOUT = int(os.environ.get("AWS_STATUS_SSH_CONNECT_TIMEOUT", "10"))
+SSH_COMMAND_TIMEOUT = float(os.environ.get("AWS_STATUS_SSH_COMMAND_TIMEOUT", "120"))
+SSH_OUTPUT_LINES = 10000
+SSH_READ_CHUNK = 64 * 1024
+SSH_RUN_COLUMNS = ("Instance ID", "Name", "Host", "Status", "Exit", "Time")
+
+
+def ssh_command_args(host, command):
+    args = [
+        "ssh", "-o", "BatchMode=yes", "-o", "StrictHostKeyChecking=accept-new",
+        "-o", f"ConnectTimeout={SSH_CONNECT_TIMEOUT}",
+    ]
+    if os.path.exists(SSH_KEY_PATH):
+        args += ["-i", SSH_KEY_PATH]
+    return [*args, f"{SSH_USER}@{host}", command]
+
+
+class SshCommandModal(ModalScreen):
+    def __init__(self, instance_ids, run_command_callback):
+        super().__init__()
+        self.instance_ids = instance_ids
+        self.run_command_callback = run_command_callback
+
+    def compose(self) -> ComposeResult:
+        if len(self.instance_ids) > 1:
+            target = f"{len(self.instance_ids)} selected instances"
+        else:
+            target = f"instance {self.instance_ids[0]}"
+        yield Label(f"Run a command over SSH on {target}", id="ssh-command-label")
+        self.command_input = Input(placeholder="Enter command (e.g., uptime)", id="ssh-command-input")
+        yield self.command_input
+        yield Button("Run", id="run-command-button", classes="button-show-all")
+        yield Button("Cancel", id="cancel-command-button", classes="button-launch-instance")
+
+    async def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "run-command-button":
+            command = self.command_input.value.strip()
+            if not command:
+                self.notify("Please enter a command.")
+                return
+            self.dismiss()
+            await self.run_command_callback(self.instance_ids, command)
+        elif event.button.id == "cancel-command-button":
+            self.dismiss()
+
+
+class SshRunScreen(ModalScreen):
+    # Runs one ssh process per host from the event loop, at most
+    # SSH_CONCURRENCY at a time. Output is streamed line by line into a
+    # shared log, and closing the screen kills whatever is still running.
+    BINDINGS = [Binding("escape", "close", "Close")]
+
+    def __init__(self, instances, command):
+        super().__init__()
+        self.instances = instances
+        self.command = command
+
+    def compose(self) -> ComposeResult:
+        self.summary_label = Label(f"$ {self.command}  ({len(self.instances)} hosts)", id="ssh-run-label")
+        yield self.summary_label
+        self.hosts_table = DataTable(id="ssh-hosts-table", cursor_type="row", zebra_stripes=True)
+        self.host_column_keys = self.hosts_table.add_columns(*SSH_RUN_COLUMNS)
+        yield self.hosts_table
+        self.output_log = Log(id="ssh-output", max_lines=SSH_OUTPUT_LINES)
+        yield self.output_log
+        yield Button("Close", id="close-ssh-run-button")
+
+    def on_mount(self) -> None:
+        for instance in self.instances:
+            self.hosts_table.add_row(instance.id, instance.name, instance.public_ip, "queued", "", "", key=instance.key)
+        self.run_worker(self.run_all(), group="ssh", exit_on_error=False)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "close-ssh-run-button":
+            self.action_close()
+
+    def action_close(self) -> None:
+        self.workers.cancel_group(self, "ssh")
+        self.dismiss()
+
+    def set_result(self, instance, status, exit_code="", elapsed=None):
+        values = (status, "" if exit_code is None else str(exit_code), "" if elapsed is None else f"{elapsed:.1f}s")
+        for column_key, value in zip(self.host_column_keys[3:], values):
+            self.hosts_table.update_cell(RowKey(instance.key), column_key, value)
+
+    async def run_all(self):
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(SSH_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self.run_host(semaphore, instance) for instance in self.instances),
+            return_exceptions=True,
+        )
+        for instance, result in zip(self.instances, results):
+            if isinstance(result, Exception):
+                self.set_result(instance, f"error: {result}")
+        succeeded = results.count(0)
+        self.summary_label.update(
+            f"$ {self.command}  ({succeeded} succeeded, {len(results) - succeeded} failed "
+            f"in {time.monotonic() - started:.1f}s)"
+        )
+
+    async def run_host(self, semaphore, instance):
+        if instance.public_ip == 'N/A':
+            self.set_result(instance, "no public IP")
+            return None
+
+        async with semaphore:
+            self.set_result(instance, "running")
+            started = time.monotonic()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *ssh_command_args(instance.public_ip, self.command),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    start_new_session=True,
+                )
+            except Exception as e:
+                self.set_result(instance, f"error: {e}", elapsed=time.monotonic() - started)
+                return None
+
+            try:
+                exit_code = await asyncio.wait_for(self.stream_output(instance, process), SSH_COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.kill(process)
+                await process.wait()
+                self.set_result(instance, "timed out", elapsed=time.monotonic() - started)
+                return None
+            except asyncio.CancelledError:
+                self.kill(process)
+                raise
+            except Exception as e:
+                self.kill(process)
+                await process.wait()
+                self.set_result(instance, f"error: {e}", elapsed=time.monotonic() - started)
+                return None
+
+            self.set_result(instance, "done" if exit_code == 0 else "failed", exit_code, time.monotonic() - started)
+            return exit_code
+
+    async def stream_output(self, instance, process):
+        # Output is read in chunks rather than with readline(), which gives
+        # up on lines longer than the stream buffer. A line that outgrows a
+        # chunk is written out in pieces.
+        pending = b""
+        while chunk := await process.stdout.read(SSH_READ_CHUNK):
+            *lines, pending = (pending + chunk).split(b"\n")
+            if len(pending) >= SSH_READ_CHUNK:
+                lines.append(pending)
+                pending = b""
+            for line in lines:
+                self.write_output(instance, line)
+        if pending:
+            self.write_output(instance, pending)
+        return await process.wait()
+
+    def write_output(self, instance, line):
+        self.output_log.write_line(f"{instance.id} | {line.decode(errors='replace').rstrip()}")
+
+    def kill(self, process):
+        # ssh runs in its own session so helpers it spawns (ProxyCommand and
+        # the like) go down with it and release the output pipe.
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
 class LightsailSSHManager:
     def __init__(self):
         self.instances = self.get_instances() 
@@ -295,11 +1490,104 @@ class LightsailSSHManager:
         return instances
 
 
+INSTANCE_COLUMNS = ("", "Instance ID", "Name", "State", "Public IP", "Region", "Account", "Tags")
+JOB_COLUMNS = ("Job", "Action", "Status", "Waited", "Ran")
+ROW_REMOVAL_REBUILD_THRESHOLD = 50
+SELECTED_MARK = "✔"
+BULK_ACTIONS = ("start", "stop", "reboot")
+EC2_BATCH_SIZE = 1000
+EC2_RESOURCE_ERRORS = ("InvalidInstanceID.", "InvalidID")
+AUTO_REFRESH_INTERVAL = float(os.environ.get("AWS_STATUS_REFRESH_INTERVAL", "60"))
+AUTO_REFRESH_MAX_INTERVAL = float(os.environ.get("AWS_STATUS_REFRESH_MAX_INTERVAL", "900"))
+AUTO_REFRESH_JITTER = 0.2
+SEARCH_RESULT_LIMIT = int(os.environ.get("AWS_STATUS_SEARCH_LIMIT", "200"))
+INSTANCE_ACTIONS = ("start-button", "stop-button", "reboot-button", "tag-button", "ip-button", "port-button", "ssh-button", "command-button")
+
+
+class FilterBar(Horizontal):
+    class Changed(Message):
+        def __init__(self, inventory_filter):
+            super().__init__()
+            self.inventory_filter = inventory_filter
+
+    def compose(self) -> ComposeResult:
+        self.state_select = Select([(state, state) for state in INSTANCE_STATES], prompt="Any state", id="filter-state")
+        yield self.state_select
+        self.tag_input = Input(placeholder="Tag key=value", id="filter-tag")
+        yield self.tag_input
+        self.type_input = Input(placeholder="Instance type", id="filter-type")
+        yield self.type_input
+        self.name_input = Input(placeholder="Name prefix", id="filter-name")
+        yield self.name_input
+        self.vpc_input = Input(placeholder="VPC id", id="filter-vpc")
+        yield self.vpc_input
+        yield Button("Filter", id="apply-filter-button", classes="button-show-all")
+        yield Button("Clear", id="clear-filter-button")
+
+    def current_filter(self):
+        tag_key, _, tag_value = self.tag_input.value.partition("=")
+        tag_key = tag_key.strip()
+        state = self.state_select.value
+        return InventoryFilter(
+            state="" if state == Select.NULL else state,
+            tag_key=tag_key,
+            # A value means nothing without a key, so "=prod" is ignored.
+            tag_value=tag_value.strip() if tag_key else "",
+            instance_type=self.type_input.value.strip(),
+            name_prefix=self.name_input.value.strip(),
+            vpc_id=self.vpc_input.value.strip(),
+        )
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        self.post_message(self.Changed(self.current_filter()))
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        event.stop()
+        if event.button.id == "clear-filter-button":
+            self.state_select.clear()
+            for filter_input in (self.tag_input, self.type_input, self.name_input, self.vpc_input):
+                filter_input.value = ""
+        self.post_message(self.Changed(self.current_filter()))
+
+
+class InstanceTable(DataTable):
+    BINDINGS = [
+        Binding("s", "app.instance('start')", "Start"),
+        Binding("x", "app.instance('stop')", "Stop"),
+        Binding("r", "app.instance('reboot')", "Reboot"),
+        Binding("t", "app.instance('tag')", "Tag"),
+        Binding("i", "app.instance('ip')", "IP"),
+        Binding("o", "app.instance('port')", "Ports"),
+        Binding("h", "app.instance('ssh')", "SSH"),
+        Binding("c", "app.instance('command')", "Run"),
+        Binding("space", "app.toggle_selection", "Select"),
+        Binding("a", "app.select_all", "Select all"),
+        Binding("slash", "app.focus_search", "Search"),
+    ]
+
+
 class AwsStatusApp(App):
     def __init__(self):
         super().__init__()
-        self.lightsail_client = boto3.client('lightsail')
-        self.ec2_client = boto3.client('ec2')
+        self.inventory = InventoryStore()
+        self.addresses = AddressIndex(ADDRESS_CACHE_TTL)
+        self.security_groups = SecurityGroupCache(self.inventory)
+        self.operations = OperationTracker(self)
+        self.hot_set = HotSetTracker(self)
+        self.jobs = JobQueue(self, JOB_SERVICE_LIMITS)
+        self.job_rows = []
+        self.inventory_parts = {source: [] for source in INVENTORY_SOURCES}
+        self.streaming_inventory = True
+        self.displayed_rows = {}
+        self.selected_ids = set()
+        self.inventory_filter = InventoryFilter()
+        self.search_index = SearchIndex()
+        self.search_query = ""
+        self.auto_refresh_timer = None
+        self.refresh_failures = 0
+        self.refresh_generation = 0
+        self.inventory_request = None
         
     CSS = """
     Screen {
@@ -312,72 +1600,34 @@ class AwsStatusApp(App):
         align: right middle;
     }
 
-    Grid {
-        padding: 0 0 0 0;
-        width: 100%;
-        height: 100%; 
-        overflow-y: auto;
-        overflow-x: auto;
-        # scrollbar-size: 1 2;
+    #instances-table {
+        height: 1fr;
     }
 
-    .instance-box {
-        text-align: center;
-        text-style: bold italic underline;
-        # color: #0052D4;
-        color: #FFFFFF;
-        width: 40%;
-        margin-left: 46;
-        text-style: bold;
-        padding-bottom: 0;
-        border: solid;
+    #filter-bar {
         height: auto;
-        background: #222222;
     }
 
-    .bg-color-0 {
-        # margin-left: 146;
-        margin-bottom: 1;
-        # width: 96%;
-        background: rgb(106, 6, 156);
-        # background: #FFFFFF;
-    }
-
-    .bg-color-1 {
-        margin-bottom: 1;
-        # width: 48%;
-        background: #ba8b02;
-        # background: rgb(156, 6, 96);
+    #filter-bar Input, #filter-bar Select {
+        width: 1fr;
     }
 
-    .bg-color-2 {
-        margin-bottom: 1;
-        # margin-left: 146;
-        # width: 96%;
-        # background: #FFFFFF;
-        background: rgb(204, 132, 24);
+    #action-bar {
+        height: auto;
     }
 
-    .bg-color-3 {
-        margin-bottom: 1;
-        # width: 48%;
-        # background: #FFFFFF;
-        background: rgb(141, 156, 6);
+    #jobs-table {
+        height: 8;
+        border-top: solid #4c9f70;
     }
 
-    .bg-color-4 {
-        margin-bottom: 1;
-        # margin-left: 146;
-        # width: 96%;
-        # background: #3d72b4;
-        background: rgb(6, 156, 151);
+    #ssh-hosts-table {
+        height: 1fr;
     }
 
-    .bg-color-5 {
-        margin-bottom: 1;
-        # width: 48%;
-        # background: #FFFFFF;
-        background: rgb(4, 125, 224);
+    #ssh-output {
+        height: 2fr;
+        border-top: solid #4c9f70;
     }
 
     Header {
@@ -469,25 +1719,31 @@ class AwsStatusApp(App):
             yield Button("Show All Instances", id="show-all-button", classes="button-show-all")
             yield Button("EC2 Instance", id="launch-instance-button", classes="button-launch-instance")
             yield Button("Lightsail", id="launch-lightsail-button", classes="button-launch-lightsail")
-            self.instances_grid = Grid()
-            self.instances_grid.styles.layout = "vertical"
-            yield self.instances_grid
+            yield FilterBar(id="filter-bar")
+            self.search_input = Input(placeholder="Search id, name, IP or tags", id="search-input")
+            yield self.search_input
+            self.instances_table = InstanceTable(id="instances-table", cursor_type="row", zebra_stripes=True)
+            self.instance_column_keys = self.instances_table.add_columns(*INSTANCE_COLUMNS)
+            yield self.instances_table
+            with Horizontal(id="action-bar"):
+                yield Button("Start", id="start-button", classes="button-start", disabled=True)
+                yield Button("Stop", id="stop-button", classes="button-stop", disabled=True)
+                yield Button("Reboot", id="reboot-button", classes="button-reboot", disabled=True)
+                yield Button("Tag", id="tag-button", classes="button-tag", disabled=True)
+                yield Button("IP", id="ip-button", classes="button-ip", disabled=True)
+                yield Button("Ports", id="port-button", classes="button-ip", disabled=True)
+                yield Button("SSH", id="ssh-button", disabled=True)
+                yield Button("Run", id="command-button", disabled=True)
+            self.jobs_table = DataTable(id="jobs-table", cursor_type="none")
+            self.job_column_keys = self.jobs_table.add_columns(*JOB_COLUMNS)
+            yield self.jobs_table
             yield Footer()
 
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "show-all-button":
-            ec2_instances = fetch_running_ec2_instances()
-            lightsail_instances, self.LIGHTSAIL_INSTANCES = fetch_lightsail_instances()
-            lightsail_databases, self.LIGHTSAIL_DATABASES = fetch_lightsail_databases()
-
-            self.instances = [
-                *ec2_instances,
-                *lightsail_instances,
-                *lightsail_databases,
-            ]
-
-            self.display_instances(self.instances)
+            if not self.refresh_inventory():
+                self.notify("A refresh is already in progress.")
             
         elif event.button.id == "launch-lightsail-button":
             modal = LaunchLightsailModal(self)
@@ -497,66 +1753,362 @@ class AwsStatusApp(App):
             modal = LaunchInstanceModal(self.create_ec2_instance)
             self.push_screen(modal)
 
-        elif event.button.id.startswith("start-"):
-            instance_id = event.button.id.split("-", 1)[1]
-            await self.show_confirmation_modal("start", instance_id, self.start_instance)
-
-        elif event.button.id.startswith("stop-"):
-            instance_id = event.button.id.split("-", 1)[1]
-            await self.show_confirmation_modal("stop", instance_id, self.stop_instance)
-
-        elif event.button.id.startswith("reboot-"):
-            instance_id = event.button.id.split("-", 1)[1]
-            await self.show_confirmation_modal("reboot", instance_id, self.reboot_instance)
-
-        elif event.button.id.startswith("tag-"):
-            instance_id = event.button.id.split("-", 1)[1]
-            await self.show_confirmation_modal("Add Tag", instance_id, self.show_tag_modal)
-            # await self.show_tag_modal(instance_id)
+        elif event.button.id in INSTANCE_ACTIONS:
+            await self.action_instance(event.button.id.removesuffix("-button"))
+
+    def on_filter_bar_changed(self, message: FilterBar.Changed) -> None:
+        if message.inventory_filter != self.inventory_filter:
+            self.inventory_filter = message.inventory_filter
+            self.refresh_inventory()
+
+    @on(Input.Changed, "#search-input")
+    def search_changed(self, event: Input.Changed) -> None:
+        self.search_query = event.value
+        self.display_instances(self.visible_records())
+
+    @on(Input.Submitted, "#search-input")
+    def search_submitted(self, event: Input.Submitted) -> None:
+        self.instances_table.focus()
+
+    def action_focus_search(self) -> None:
+        self.search_input.focus()
+
+    def visible_records(self):
+        records = self.inventory.records
+        if not self.search_query.strip():
+            self.search_input.border_subtitle = ""
+            return records
+
+        # Adding a DataTable row costs far more than matching it, so search
+        # results are capped to keep every keystroke responsive.
+        matches = self.search_index.search(self.search_query)
+        visible = list(itertools.islice((record for record in records if record.key in matches), SEARCH_RESULT_LIMIT))
+        self.search_input.border_subtitle = f"{len(visible)} of {len(matches)} matches"
+        return visible
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        self.update_action_bar()
+
+    def selected_instance(self):
+        table = self.instances_table
+        if table.row_count == 0:
+            return None
+        row_key, _ = table.coordinate_to_cell_key(Coordinate(table.cursor_row, 0))
+        return self.inventory.get(row_key.value)
+
+    def update_action_bar(self):
+        instance = self.selected_instance()
+        state = instance.state if instance else None
+        bulk = bool(self.selected_ids)
+        self.query_one("#start-button").disabled = not bulk and (state is None or state in ("running", "available"))
+        self.query_one("#stop-button").disabled = not bulk and (state is None or state not in ("running", "available"))
+        self.query_one("#reboot-button").disabled = not bulk and state is None
+        self.query_one("#tag-button").disabled = not bulk and state != "running"
+        self.query_one("#ip-button").disabled = state != "running"
+        self.query_one("#port-button").disabled = not bulk and state is None
+        self.query_one("#ssh-button").disabled = state != "running"
+        self.query_one("#command-button").disabled = not bulk and state != "running"
+
+    def set_selected(self, key, selected: bool):
+        if selected:
+            self.selected_ids.add(key)
+        else:
+            self.selected_ids.discard(key)
+        mark = SELECTED_MARK if selected else ""
+        row = self.displayed_rows.get(key)
+        if row is not None and row[0] != mark:
+            self.displayed_rows[key] = (mark, *row[1:])
+            self.instances_table.update_cell(RowKey(key), self.instance_column_keys[0], mark)
+
+    def action_toggle_selection(self) -> None:
+        instance = self.selected_instance()
+        if instance is not None:
+            self.set_selected(instance.key, instance.key not in self.selected_ids)
+            self.update_action_bar()
+
+    def action_select_all(self) -> None:
+        select = not self.displayed_rows.keys() <= self.selected_ids
+        for key in list(self.displayed_rows):
+            self.set_selected(key, select)
+        self.update_action_bar()
+
+    def action_select_none(self) -> None:
+        for key in list(self.selected_ids):
+            self.set_selected(key, False)
+        self.update_action_bar()
+
+    async def action_instance(self, action: str) -> None:
+        if action in BULK_ACTIONS and self.selected_ids:
+            keys = sorted(self.selected_ids)
+            await self.show_confirmation_modal(action, keys, partial(self.bulk_action, action))
+            return
+        if action == "port" and self.selected_ids:
+            self.push_screen(PortModal(sorted(self.selected_ids), self.open_ports))
+            return
+        if action == "tag" and self.selected_ids:
+            self.push_screen(BulkTagModal(sorted(self.selected_ids), self.bulk_tag))
+            return
+        if action == "command" and self.selected_ids:
+            self.push_screen(SshCommandModal(sorted(self.selected_ids), self.run_ssh_command))
+            return
+
+        instance = self.selected_instance()
+        if instance is None:
+            self.notify("Select an instance first.")
+            return
+        if self.query_one(f"#{action}-button").disabled:
+            self.notify(f"Cannot {action} {instance.id} while it is {instance.state}.")
+            return
+
+        key = instance.key
+        if action == "start":
+            await self.show_confirmation_modal("start", key, self.start_instance)
+        elif action == "stop":
+            await self.show_confirmation_modal("stop", key, self.stop_instance)
+        elif action == "reboot":
+            await self.show_confirmation_modal("reboot", key, self.reboot_instance)
+        elif action == "tag":
+            await self.show_confirmation_modal("Add Tag", key, self.show_tag_modal)
+        elif action == "ip":
+            await self.show_confirmation_modal("IP Management", key, self.show_ip_modal)
+        elif action == "port":
+            self.push_screen(PortModal([key], self.open_ports))
+        elif action == "command":
+            self.push_screen(SshCommandModal([key], self.run_ssh_command))
+        elif action == "ssh":
+            await self.open_ssh_connection(key)
+
+    def on_mount(self) -> None:
+        self.set_interval(1, self.tick_running_jobs)
 
-        elif event.button.id.startswith("ip-"):
-            instance_id = event.button.id.split("-", 1)[1]
-            await self.show_confirmation_modal("IP Management", instance_id, self.show_ip_modal)
-            # await self.show_ip_modal(instance_id)
-            
-        elif event.button.id.startswith("ssh-"):
-                instance_id = event.button.id.split("-", 1)[1]
-                await self.open_ssh_connection(instance_id)
+        try:
+            cached = load_inventory_cache()
+        except (sqlite3.Error, OSError, ValueError, TypeError, KeyError) as e:
+            self.notify(f"Error loading inventory cache: {str(e)}")
+            cached = None
+        if cached:
+            saved_at, self.inventory_parts = cached
+            self.apply_inventory()
+            self.notify(f"Showing inventory cached at {time.strftime('%H:%M:%S', time.localtime(saved_at))}, refreshing...")
+            self.refresh_inventory(revalidate=True)
+        else:
+            self.schedule_auto_refresh()
+
+    def schedule_auto_refresh(self):
+        # Each refresh schedules the next one once it has finished. Failed
+        # refreshes back off exponentially, and the jitter keeps several
+        # dashboards from polling AWS in lockstep.
+        if AUTO_REFRESH_INTERVAL <= 0:
+            return
+        if self.auto_refresh_timer is not None:
+            self.auto_refresh_timer.stop()
+        delay = min(AUTO_REFRESH_INTERVAL * 2 ** self.refresh_failures, AUTO_REFRESH_MAX_INTERVAL)
+        delay *= random.uniform(1 - AUTO_REFRESH_JITTER, 1 + AUTO_REFRESH_JITTER)
+        self.auto_refresh_timer = self.set_timer(delay, self.auto_refresh)
+
+    def auto_refresh(self):
+        self.auto_refresh_timer = None
+        self.refresh_inventory(revalidate=True)
+
+    def inventory_refreshed(self, complete: bool):
+        self.refresh_failures = 0 if complete else self.refresh_failures + 1
+        self.schedule_auto_refresh()
+
+    def refresh_inventory(self, revalidate=False):
+        # Refreshes are single-flight: a request for the same view joins the
+        # fetch already in flight, and a request for a different view makes
+        # that fetch stale. Stale fetches stop pulling pages and are never
+        # applied, so only the newest complete snapshot reaches the table.
+        if self.inventory_request == self.inventory_filter:
+            return False
+
+        self.refresh_generation += 1
+        self.inventory_request = self.inventory_filter
+        self.workers.cancel_group(self, "inventory")
+
+        # When revalidating, the current grid stays up until the new
+        # snapshot is complete instead of streaming over it page by page.
+        self.inventory_parts = {source: [] for source in INVENTORY_SOURCES}
+        self.streaming_inventory = not revalidate
+        self.security_groups.clear()
+        if self.streaming_inventory:
+            self.apply_inventory()
+
+        self.fetch_inventory(self.refresh_generation, self.inventory_filter, self.inventory_parts)
+        return True
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self.refresh_generation
+
+    def finish_inventory(self, generation: int, complete: bool, apply: bool = True):
+        if self.is_stale(generation):
+            return
+        self.inventory_request = None
+        if apply:
+            self.apply_inventory()
+        self.inventory_refreshed(complete)
+
+    @work(thread=True, group="inventory", exit_on_error=False)
+    def fetch_inventory(self, generation, inventory_filter, parts):
+        try:
+            with ThreadPoolExecutor(max_workers=ACCOUNT_CONCURRENCY) as executor:
+                account_regions = dict(zip(session_pool.accounts, executor.map(self.fetch_account_regions, session_pool.accounts)))
+        except Exception as e:
+            self.notify(f"Error listing enabled regions: {str(e)}")
+            self.call_from_thread(self.finish_inventory, generation, False, False)
+            return
+
+        tasks = [
+            (source, region, account)
+            for account, regions in account_regions.items()
+            for source in INVENTORY_SOURCES
+            for region in regions["ec2" if source == "ec2" else "lightsail"]
+        ]
+        with ThreadPoolExecutor(max_workers=REGION_CONCURRENCY) as executor:
+            futures = [
+                executor.submit(self.fetch_inventory_source, generation, source, region, account, inventory_filter)
+                for source, region, account in tasks
+            ]
+            results = [future.result() for future in futures]
+        if self.is_stale(generation):
+            return
+
+        for (source, region, account), fetched in zip(tasks, results):
+            if not fetched:
+                self.call_from_thread(self.keep_previous_records, generation, source, region, account)
+        complete = all(results)
+
+        if complete and not inventory_filter.active:
+            try:
+                save_inventory_cache(parts)
+            except (sqlite3.Error, OSError) as e:
+                self.notify(f"Error saving inventory cache: {str(e)}")
+        self.call_from_thread(self.finish_inventory, generation, complete)
+
+    def fetch_account_regions(self, account: str):
+        return {service: fetch_enabled_regions(service, account) for service in ("ec2", "lightsail")}
+
+    def fetch_inventory_source(self, generation: int, source: str, region: str, account: str, inventory_filter) -> bool:
+        try:
+            if source == "ec2":
+                pages = fetch_running_ec2_instances(region, account, inventory_filter)
+            elif source == "lightsail":
+                pages = fetch_lightsail_instances(region, account)
+            else:
+                pages = fetch_lightsail_databases(region, account)
+
+            # Pages are fetched lazily, so a stale refresh stops here
+            # without requesting the rest of the listing.
+            for page in pages:
+                if self.is_stale(generation):
+                    return False
+                if source != "ec2":
+                    page = [record for record in page if inventory_filter.matches(record)]
+                self.call_from_thread(self.merge_inventory_page, generation, source, page)
+            return True
+        except Exception as e:
+            self.notify(f"Error fetching {source} inventory for {account} in {region}: {str(e)}")
+            return False
+
+    def apply_polled_records(self, records):
+        for record in records:
+            current = self.inventory.update_record(record)
+            if current is not None:
+                self.search_index.reindex(current)
+        self.display_instances(self.visible_records())
+
+    def track_transition(self, key, targets):
+        record = self.inventory.get(key)
+        if record is not None:
+            self.hot_set.track(record, targets)
+
+    def keep_previous_records(self, generation: int, source: str, region: str, account: str):
+        # A region that failed to refresh keeps its last known records
+        # instead of dropping off the dashboard until the next refresh.
+        if self.is_stale(generation):
+            return
+        self.inventory_parts[source].extend(
+            record for record in self.inventory.by_kind(source)
+            if record.region == region and record.account == account
+        )
 
-    async def open_ssh_connection(self, instance_id: str):
-        instance = next((i for i in self.instances if i[0] == instance_id), None)
+    def merge_inventory_page(self, generation: int, source: str, page):
+        if self.is_stale(generation):
+            return
+        self.inventory_parts[source].extend(page)
+        self.search_index.update(page)
+        if self.streaming_inventory:
+            self.apply_inventory()
+
+    def apply_inventory(self):
+        previous = self.inventory.snapshot
+        snapshot = self.inventory.replace(self.inventory_parts)
+        self.search_index.update(snapshot.records)
+        self.search_index.retain(snapshot.by_key.keys())
+        for record in snapshot.records:
+            if record.state not in SETTLED_STATES and record.key not in self.hot_set.hot:
+                self.hot_set.track(record)
+        if self.streaming_inventory:
+            self.display_instances(self.visible_records())
+            return
+
+        # A revalidated snapshot is compared with the one on screen, and the
+        # table is only touched when some record actually changed.
+        changed, removed = snapshot.changes_since(previous)
+        self.sub_title = f"Updated {time.strftime('%H:%M:%S')}, {len(changed)} changed, {len(removed)} removed"
+        if changed or removed:
+            self.display_instances(self.visible_records())
+
+    async def open_ssh_connection(self, key):
+        instance = self.inventory.get(key)
         if instance:
-            _, _, state, public_ip, _ = instance
+            state, public_ip = instance.state, instance.public_ip
             if state == "running":
-                pem_file = f"/Users/vgts/Desktop/AWS_UI/demo.pem"
+                pem_file = SSH_KEY_PATH
                 if not os.path.exists(pem_file):
                     self.notify(f"Error: PEM file '{pem_file}' not found. Make sure it's in the correct directory.")
                     return
-                ssh_command = f"ssh -i {pem_file} ubuntu@{public_ip}"
+                ssh_command = f"ssh -i {pem_file} {SSH_USER}@{public_ip}"
                 print(f"Opening SSH session to {public_ip} in a new Terminal window...")
 
                 subprocess.run(["osascript", "-e", f'tell app "Terminal" to do script "{ssh_command}"'])
             else:
                 self.notify("Instance is not running. Unable to open SSH.")
             
-    async def show_confirmation_modal(self, action: str, instance_id: str, apply_action_callback):
-        modal = ConfirmationModal(action, instance_id, apply_action_callback)
+    async def run_ssh_command(self, keys, command: str):
+        instances = [instance for instance in map(self.inventory.get, keys) if instance is not None]
+        if instances:
+            self.push_screen(SshRunScreen(instances, command))
+        self.action_select_none()
+
+    def location_of(self, key):
+        return key.region, key.account
+
+    def client_for(self, service: str, key):
+        return get_client(service, key.region, key.account)
+
+    async def show_confirmation_modal(self, action: str, key, apply_action_callback):
+        modal = ConfirmationModal(action, key, apply_action_callback)
         self.push_screen(modal)
 
-    async def show_ip_modal(self, instance_id: str):
+    async def show_ip_modal(self, key):
         modal = IpModal(
-            instance_id,
-            "ec2" if instance_id.startswith("i-") else "lightsail",
+            key,
+            "ec2" if key.kind == "ec2" else "lightsail",
             self.manage_ip,  
             self.manage_port
         )
         self.push_screen(modal)
 
-    async def show_tag_modal(self, instance_id: str):
-        modal = TagModal(instance_id, self.apply_tag_to_instance)
+    async def show_tag_modal(self, key):
+        modal = TagModal(key, self.apply_tag_to_instance)
         self.push_screen(modal)
         
-    async def add_tag_to_instance(self, instance_id: str, tag_key: str, instance_type: str):
+    @background_job("tag")
+    def add_tag_to_instance(self, key, tag_key: str, instance_type: str):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
         try:
             if instance_type == "ec2":
                 ec2_client.create_tags(
@@ -572,98 +2124,263 @@ class AwsStatusApp(App):
                 self.notify(f"Tag '{tag_key}' added to Lightsail instance {instance_id}.")
         except Exception as e:
             self.notify(f"Error adding tag: {str(e)}")
+            raise
 
-    async def start_instance(self, instance_id: str):
+    @background_job("start")
+    def start_instance(self, key):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
         try:
-            if instance_id.startswith("i-"):  
+            if key.kind == "ec2":  
                 ec2_client.start_instances(InstanceIds=[instance_id])
                 self.notify(f"EC2 instance {instance_id} started.")
-            elif instance_id in self.LIGHTSAIL_INSTANCES:  
+            elif key.kind == "lightsail":  
                 lightsail_client.start_instance(instanceName=instance_id)
                 self.notify(f"Lightsail instance {instance_id} started.")
-            elif instance_id in self.LIGHTSAIL_DATABASES:  
+            elif key.kind == "databases":  
                 lightsail_client.start_relational_database(relationalDatabaseName=instance_id)
                 self.notify(f"Lightsail database {instance_id} started.")
+            self.track_transition(key, ("running", "available"))
         except Exception as e:
             self.notify(f"Error starting instance {instance_id}: {str(e)}")
+            raise
 
-    async def stop_instance(self, instance_id: str):
+    @background_job("stop")
+    def stop_instance(self, key):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
         try:
-            if instance_id.startswith("i-"):  
+            if key.kind == "ec2":  
                 ec2_client.stop_instances(InstanceIds=[instance_id])
                 self.notify(f"EC2 instance {instance_id} stopped.")
-            elif instance_id in self.LIGHTSAIL_INSTANCES:  
+            elif key.kind == "lightsail":  
                 lightsail_client.stop_instance(instanceName=instance_id)
                 self.notify(f"Lightsail instance {instance_id} stopped.")
-            elif instance_id in self.LIGHTSAIL_DATABASES:  
+            elif key.kind == "databases":  
                 lightsail_client.stop_relational_database(relationalDatabaseName=instance_id)
                 self.notify(f"Lightsail database {instance_id} stopped.")
+            self.track_transition(key, ("stopped",))
         except Exception as e:
             self.notify(f"Error stopping instance {instance_id}: {str(e)}")
+            raise
 
-    async def reboot_instance(self, instance_id: str):
+    @background_job("reboot")
+    def reboot_instance(self, key):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
         try:
-            if instance_id.startswith("i-"):  
+            if key.kind == "ec2":  
                 ec2_client.reboot_instances(InstanceIds=[instance_id])
                 self.notify(f"EC2 instance {instance_id} rebooted.")
-            elif instance_id in self.LIGHTSAIL_INSTANCES: 
+            elif key.kind == "lightsail": 
                 response = lightsail_client.reboot_instance(instanceName=instance_id)
-                operation_id = response['operations'][0]['id'] 
-                
-                while True:
-                    operation_response = lightsail_client.get_operations()
-                   
-                    operation = next((op for op in operation_response['operations'] if op['id'] == operation_id), None)
-                    if operation:
-                        status = operation['status']
-                        if status == 'Succeeded':
-                            self.notify(f"Lightsail instance {instance_id} rebooted successfully.")
-                            break
-                        elif status == 'Failed':
-                            self.notify(f"Reboot operation failed for Lightsail instance {instance_id}.")
-                            break
-                        else:
-                            time.sleep(5)
-                    else:
-                        time.sleep(5)
+                self.notify(f"Rebooting Lightsail instance {instance_id}...")
+                self.operations.track(
+                    lightsail_client,
+                    response['operations'][0]['id'],
+                    partial(
+                        self.report_operation,
+                        f"Lightsail instance {instance_id} rebooted successfully.",
+                        f"Reboot operation failed for Lightsail instance {instance_id}.",
+                    ),
+                )
 
-            elif instance_id in self.LIGHTSAIL_DATABASES:  
+            elif key.kind == "databases":  
                 response = lightsail_client.reboot_relational_database(relationalDatabaseName=instance_id)
-                operation_id = response['operations'][0]['id']
-
-                while True:
-                    operation_response = lightsail_client.get_operations()
-                   
-                    operation = next((op for op in operation_response['operations'] if op['id'] == operation_id), None)
-                    if operation:
-                        status = operation['status']
-                        if status == 'Succeeded':
-                            self.notify(f"Lightsail database {instance_id} rebooted successfully.")
-                            break
-                        elif status == 'Failed':
-                            self.notify(f"Reboot operation failed for Lightsail database {instance_id}.")
-                            break
-                        else:
-                            time.sleep(5)
-                    else:
-                        time.sleep(5)
+                self.notify(f"Rebooting Lightsail database {instance_id}...")
+                self.operations.track(
+                    lightsail_client,
+                    response['operations'][0]['id'],
+                    partial(
+                        self.report_operation,
+                        f"Lightsail database {instance_id} rebooted successfully.",
+                        f"Reboot operation failed for Lightsail database {instance_id}.",
+                    ),
+                )
+            self.track_transition(key, ("running", "available"))
         except Exception as e:
             self.notify(f"Error rebooting instance {instance_id}: {str(e)}")
+            raise
     
-    async def apply_tag_to_instance(self, instance_id: str, tag: str):
+    async def bulk_action(self, action: str, keys):
+        ec2_batches = {}
+        skipped = 0
+        for key in keys:
+            instance = self.inventory.get(key)
+            if instance is None:
+                continue
+            # Start only applies to stopped instances; stop and reboot only
+            # to running ones.
+            active = instance.state in ("running", "available")
+            if active == (action == "start"):
+                skipped += 1
+                continue
+
+            if instance.kind == "ec2":
+                ec2_batches.setdefault((instance.region, instance.account), []).append(key)
+            elif action == "start":
+                await self.start_instance(key)
+            elif action == "stop":
+                await self.stop_instance(key)
+            elif action == "reboot":
+                await self.reboot_instance(key)
+
+        for (region, account), batch in ec2_batches.items():
+            for index in range(0, len(batch), EC2_BATCH_SIZE):
+                chunk = batch[index:index + EC2_BATCH_SIZE]
+                self.jobs.submit(
+                    "ec2", f"{action} {len(chunk)} EC2 instances in {region}",
+                    self.run_ec2_batch, action, chunk, region, account,
+                )
+
+        if skipped:
+            self.notify(f"Skipped {skipped} instances whose current state does not allow {action}.")
+        self.action_select_none()
+
+    def run_ec2_batch(self, action: str, keys, region: str, account: str):
+        ec2_client = get_client("ec2", region, account)
+        instance_ids = [key.id for key in keys]
+        try:
+            if action == "start":
+                ec2_client.start_instances(InstanceIds=instance_ids)
+                self.notify(f"{len(instance_ids)} EC2 instances in {region} started.")
+            elif action == "stop":
+                ec2_client.stop_instances(InstanceIds=instance_ids)
+                self.notify(f"{len(instance_ids)} EC2 instances in {region} stopped.")
+            elif action == "reboot":
+                ec2_client.reboot_instances(InstanceIds=instance_ids)
+                self.notify(f"{len(instance_ids)} EC2 instances in {region} rebooted.")
+            for key in keys:
+                self.track_transition(key, ("stopped",) if action == "stop" else ("running",))
+        except Exception as e:
+            self.notify(f"Error during bulk {action} of {len(instance_ids)} EC2 instances in {region}: {str(e)}")
+            raise
+
+    async def bulk_tag(self, keys, tags):
+        ec2_batches = {}
+        for key in keys:
+            instance = self.inventory.get(key)
+            if instance is None:
+                continue
+            if instance.kind == "ec2":
+                ec2_batches.setdefault((instance.region, instance.account), []).append(key)
+            else:
+                self.jobs.submit("lightsail", f"tag {key.id}", self.tag_lightsail_resource, key, tags)
+
+        for (region, account), batch in ec2_batches.items():
+            for index in range(0, len(batch), EC2_BATCH_SIZE):
+                chunk = batch[index:index + EC2_BATCH_SIZE]
+                self.jobs.submit(
+                    "ec2", f"tag {len(chunk)} EC2 instances in {region}",
+                    self.tag_ec2_batch, chunk, tags, region, account,
+                )
+        self.action_select_none()
+
+    def tag_ec2_batch(self, keys, tags, region: str, account: str):
+        ec2_client = get_client("ec2", region, account)
+        ec2_tags = [{"Key": tag_key, "Value": value} for tag_key, value in tags.items()]
+        target = f"{len(keys)} EC2 instances in {region}"
+        results = {}
+        try:
+            ec2_client.create_tags(Resources=[key.id for key in keys], Tags=ec2_tags)
+            results = dict.fromkeys(keys)
+        except Exception as e:
+            # create_tags is all or nothing, so one bad id fails the chunk.
+            # Only then is it worth retagging one by one to find the bad ids;
+            # errors such as AccessDenied or throttling would fail them all.
+            if not any(code in str(e) for code in EC2_RESOURCE_ERRORS):
+                self.call_from_thread(self.report_tags, dict.fromkeys(keys, str(e)), tags, target)
+                raise
+            for key in keys:
+                try:
+                    ec2_client.create_tags(Resources=[key.id], Tags=ec2_tags)
+                    results[key] = None
+                except Exception as e:
+                    results[key] = str(e)
+        self.call_from_thread(self.report_tags, results, tags, target)
+
+    def tag_lightsail_resource(self, key, tags):
+        lightsail_client = self.client_for("lightsail", key)
         try:
-            if instance_id.startswith("i-"): 
+            lightsail_client.tag_resource(
+                resourceName=key.id,
+                tags=[{"key": tag_key, "value": value} for tag_key, value in tags.items()],
+            )
+            self.call_from_thread(self.report_tags, {key: None}, tags, key.id)
+        except Exception as e:
+            self.call_from_thread(self.report_tags, {key: str(e)}, tags, key.id)
+            raise
+
+    def report_tags(self, results, tags, target: str):
+        failed = {key: error for key, error in results.items() if error is not None}
+        for key, error in results.items():
+            if error is None:
+                record = self.inventory.update_tags(key, tags)
+                if record is not None:
+                    self.search_index.reindex(record)
+        self.display_instances(self.visible_records())
+
+        tagged = len(results) - len(failed)
+        if tagged:
+            self.notify(f"Tags {', '.join(tags)} applied to {tagged} of {len(results)} resources ({target}).")
+        by_error = {}
+        for key, error in failed.items():
+            by_error.setdefault(error, []).append(key)
+        for error, keys in by_error.items():
+            if len(keys) == 1:
+                self.notify(f"Error tagging {keys[0].id}: {error}")
+            else:
+                self.notify(f"Error tagging {len(keys)} resources: {error}")
+
+    def on_job_updated(self, message: JobUpdated) -> None:
+        job = message.job
+        row = (
+            str(job.id), job.description, job.status if job.error is None else f"failed: {job.error}",
+            f"{job.waited:.1f}s", f"{job.ran:.1f}s",
+        )
+        if job.id not in self.job_rows:
+            self.jobs_table.add_row(*row, key=str(job.id))
+            self.job_rows.append(job.id)
+            self.jobs_table.scroll_end(animate=False)
+            if len(self.job_rows) > JOBS_PANEL_LIMIT:
+                self.jobs_table.remove_row(str(self.job_rows.pop(0)))
+        else:
+            for column_key, value in zip(self.job_column_keys[2:], row[2:]):
+                self.jobs_table.update_cell(str(job.id), column_key, value)
+
+    def tick_running_jobs(self) -> None:
+        for job in list(self.jobs.active.values()):
+            self.post_message(JobUpdated(job))
+
+    def report_operation(self, success_message: str, failure_message: str, status: str, error=None):
+        if status in ("Succeeded", "Completed"):
+            self.notify(success_message)
+        elif error is not None:
+            self.notify(f"{failure_message} {error}")
+        else:
+            self.notify(failure_message)
+
+    @background_job("tag")
+    def apply_tag_to_instance(self, key, tag: str):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
+        try:
+            if key.kind == "ec2": 
                 ec2_client.create_tags(Resources=[instance_id], Tags=[{"Key": tag, "Value": tag}])
                 self.notify(f"Tag '{tag}' applied to EC2 instance {instance_id}")
 
-            elif instance_id in self.LIGHTSAIL_INSTANCES:  
+            elif key.kind == "lightsail":  
                 lightsail_client.tag_resource(
                     resourceName=instance_id,
                     tags=[{"key": tag, "value": "Environment"}]
                 )
                 self.notify(f"Tag '{tag}' applied to Lightsail instance {instance_id}")
 
-            elif instance_id in self.LIGHTSAIL_DATABASES: 
+            elif key.kind == "databases": 
                 lightsail_client.tag_resource(
                     resourceName=instance_id,
                     tags=[{"key": tag, "value": "Environment"}]
@@ -672,99 +2389,137 @@ class AwsStatusApp(App):
 
         except Exception as e:
             self.notify(f"Error applying tag to {instance_id}: {str(e)}")
+            raise
             
     def get_static_ip_name(self, ip: str) -> str:
         """
         Retrieves the static IP name associated with a given IP address.
         """
         try:
-            
-            response = lightsail_client.get_static_ips()
-            static_ips = response.get("staticIps", [])
-
-            for static_ip in static_ips:
-                if static_ip["ipAddress"] == ip:
-                    return static_ip["name"] 
-                
-            return None
+            static_ip = self.addresses.by_ip("lightsail", ip, default_region())
+            return static_ip.name if static_ip else None
         except Exception as e:
             self.notify(f"Error retrieving static IP name for {ip}: {str(e)}")
             return None
 
-    def detach_elastic_ip_by_instance(self, instance_id: str):
+    def detach_elastic_ip_by_instance(self, key):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        location = self.location_of(key)
         try:
-            response = ec2_client.describe_addresses(Filters=[{
-                'Name': 'instance-id',
-                'Values': [instance_id]
-            }])
+            addresses = self.addresses.by_instance("ec2", instance_id, *location)
 
-            addresses = response.get("Addresses", [])
-            
             if addresses:
                 for address in addresses:
-                    association_id = address.get("AssociationId")
-                    if association_id:
-                        ec2_client.disassociate_address(AssociationId=association_id)
-                        self.notify(f"Elastic IP {address['PublicIp']} successfully detached from EC2 instance {instance_id}.")
+                    if address.association_id:
+                        ec2_client.disassociate_address(AssociationId=address.association_id)
+                        self.notify(f"Elastic IP {address.ip} successfully detached from EC2 instance {instance_id}.")
                     else:
-                        self.notify(f"Elastic IP {address['PublicIp']} is not associated with EC2 instance {instance_id}.")
+                        self.notify(f"Elastic IP {address.ip} is not associated with EC2 instance {instance_id}.")
             else:
                 self.notify(f"No Elastic IP found attached to EC2 instance {instance_id}.")
+        finally:
+            self.addresses.invalidate("ec2", *location)
 
-        except Exception as e:
-            self.notify(f"Error detaching Elastic IP from EC2 instance '{instance_id}': {str(e)}")
-
-    def detach_static_ip_by_instance(self, instance_name: str):
+    def detach_static_ip_by_instance(self, key):
+        instance_name = key.id
+        lightsail_client = self.client_for("lightsail", key)
+        location = self.location_of(key)
         try:
-            response = lightsail_client.get_static_ips()
-            static_ips = response.get("staticIps", [])
-            static_ip_to_detach = None
-            for static_ip in static_ips:
-                if static_ip.get("attachedTo") == instance_name:
-                    static_ip_to_detach = static_ip["name"]
-                    break
-
-            if static_ip_to_detach:
-               
+            static_ips = self.addresses.by_instance("lightsail", instance_name, *location)
+
+            if static_ips:
+                static_ip_to_detach = static_ips[0].name
                 lightsail_client.detach_static_ip(staticIpName=static_ip_to_detach)
                 self.notify(f"Static IP '{static_ip_to_detach}' successfully detached from instance '{instance_name}'.")
             else:
-              
                 self.notify(f"No static IP is attached to the instance '{instance_name}'.")
-        except Exception as e:
-            self.notify(f"Error detaching Static IP from instance '{instance_name}': {str(e)}")
+        finally:
+            self.addresses.invalidate("lightsail", *location)
             
-    def get_security_group_id(self, instance_id):
+    def get_security_group_id(self, key):
+        groups = self.security_groups.groups_for([key], *self.location_of(key))
+        return list(groups.get(key, ()))
+
+
+    def add_ipv4_rules(self, security_group_id, protocol, port_ranges, cidr_block, region=None, account=None):
+        ec2_client = get_client("ec2", region, account)
+        permissions = [
+            {
+                "IpProtocol": protocol,
+                "FromPort": from_port,
+                "ToPort": to_port,
+                "IpRanges": [{"CidrIp": cidr_block}],
+            }
+            for from_port, to_port in port_ranges
+        ]
         try:
-            response = ec2_client.describe_instances(InstanceIds=[instance_id])
-            security_groups = response["Reservations"][0]["Instances"][0]["SecurityGroups"]
-            return [sg["GroupId"] for sg in security_groups]
+            ec2_client.authorize_security_group_ingress(GroupId=security_group_id, IpPermissions=permissions)
+            return True
         except Exception as e:
-            print(f"Error retrieving security groups: {e}")
-            return []
-
-
-    def add_ipv4_rule(self, security_group_id, protocol, port_range, cidr_block):
-        try:
-            self.ec2_client.authorize_security_group_ingress(
-                GroupId=security_group_id,
-                IpPermissions=[
-                    {
-                        "IpProtocol": protocol,
-                        "FromPort": port_range[0],
-                        "ToPort": port_range[1],
-                        "IpRanges": [{"CidrIp": cidr_block}],
-                    }
-                ],
+            if "InvalidPermission.Duplicate" not in str(e):
+                self.notify(f"Error adding rules to security group {security_group_id}: {str(e)}")
+                return False
+
+        # One rule already existing rejects the whole request, so fall back
+        # to adding the rules one at a time and skip the duplicates.
+        added = True
+        for permission in permissions:
+            try:
+                ec2_client.authorize_security_group_ingress(GroupId=security_group_id, IpPermissions=[permission])
+            except Exception as e:
+                if "InvalidPermission.Duplicate" not in str(e):
+                    self.notify(f"Error adding rule to security group {security_group_id}: {str(e)}")
+                    added = False
+        return added
+
+    def open_ec2_ports(self, keys, ports, region, account):
+        groups = self.security_groups.groups_for(keys, region, account)
+        unique_groups = list(dict.fromkeys(
+            group_id for key in keys for group_id in groups.get(key, ())
+        ))
+        without_groups = [key.id for key in keys if not groups.get(key)]
+        if without_groups:
+            self.notify(f"No security groups found for EC2 instances: {', '.join(without_groups)}.")
+
+        port_ranges = [(port, port) for port in ports]
+        opened = [
+            group_id for group_id in unique_groups
+            if self.add_ipv4_rules(group_id, "tcp", port_ranges, "0.0.0.0/0", region, account)
+        ]
+        if opened:
+            self.notify(
+                f"Ports {', '.join(map(str, ports))} opened on {len(opened)} security groups "
+                f"for {len(keys) - len(without_groups)} EC2 instances in {region}."
             )
-            print(f"Successfully added rule to security group {security_group_id}")
-        except Exception as e:
-            print(f"Error adding rule: {e}")
+        if len(opened) < len(unique_groups):
+            raise RuntimeError(f"{len(unique_groups) - len(opened)} security groups could not be updated")
+
+    async def open_ports(self, keys, ports):
+        ec2_batches = {}
+        for key in keys:
+            instance = self.inventory.get(key)
+            if instance is None:
+                continue
+            if instance.kind == "ec2":
+                ec2_batches.setdefault((instance.region, instance.account), []).append(key)
+            elif instance.kind == "lightsail":
+                for port in ports:
+                    await self.manage_port(key, "lightsail", port)
+
+        for (region, account), batch in ec2_batches.items():
+            self.jobs.submit(
+                "ec2", f"open ports {', '.join(map(str, ports))} on {len(batch)} EC2 instances in {region}",
+                self.open_ec2_ports, batch, ports, region, account,
+            )
+        self.action_select_none()
 
 
-    def add_lightsail_ipv4_rule(self, instance_name, protocol, port_range, cidr_block):
+    def add_lightsail_ipv4_rule(self, key, protocol, port_range, cidr_block):
+        instance_name = key.id
+        lightsail_client = self.client_for("lightsail", key)
         try:
-            response = self.lightsail_client.open_instance_public_ports(
+            response = lightsail_client.open_instance_public_ports(
                 portInfo={
                     "fromPort": port_range[0],
                     "toPort": port_range[1],
@@ -778,7 +2533,7 @@ class AwsStatusApp(App):
             
             print(f"Port {port_range[0]}-{port_range[1]} rule added successfully to Lightsail instance {instance_name}.")
             
-            instance_details = self.lightsail_client.get_instance(instanceName=instance_name)
+            instance_details = lightsail_client.get_instance(instanceName=instance_name)
             public_ports = instance_details["instance"]["networking"]["ports"]
             print(f"Current public ports for {instance_name}: {public_ports}")
             
@@ -786,17 +2541,19 @@ class AwsStatusApp(App):
             print(f"Error adding port rule to Lightsail instance {instance_name}: {e}")
             if hasattr(e, "response"):
                 print(f"Full error response: {e.response}")
+            raise
 
     def create_or_get_key_pair(self, key_name: str) -> str:
+        ec2_client = get_client("ec2")
         try:
-            self.ec2_client.describe_key_pairs(KeyNames=[key_name])
+            ec2_client.describe_key_pairs(KeyNames=[key_name])
             print(f"Key pair '{key_name}' already exists. Using the existing key pair.")
             return key_name 
-        except self.ec2_client.exceptions.ClientError as e:
+        except ec2_client.exceptions.ClientError as e:
             if "InvalidKeyPair.NotFound" in str(e):
               
                 print(f"Creating new key pair '{key_name}'.")
-                key_pair = self.ec2_client.create_key_pair(KeyName=key_name)
+                key_pair = ec2_client.create_key_pair(KeyName=key_name)
                 private_key = key_pair['KeyMaterial']
               
                 save_path = f"/Users/vgts/Downloads/{key_name}.pem"
@@ -817,22 +2574,30 @@ class AwsStatusApp(App):
                 raise
 
 
-    async def manage_ip(self, instance_id: str, ip: str, action: str, port: int = None):
+    @background_job("ip")
+    def manage_ip(self, key, ip: str, action: str, port: int = None):
+        instance_id = key.id
+        ec2_client = self.client_for("ec2", key)
+        lightsail_client = self.client_for("lightsail", key)
+        location = self.location_of(key)
         try:
             if action == "create_and_attach":
-                if instance_id in self.LIGHTSAIL_INSTANCES:
+                if key.kind == "lightsail":
                     static_ip_name = f"{instance_id}-ip"
 
-                    try:
-                        self.notify(f"Allocating a new static IP: {static_ip_name}...")
-                        response = lightsail_client.allocate_static_ip(staticIpName=static_ip_name)
-                        static_ip = response["staticIp"]["ipAddress"]
-                        self.notify(f"New Static IP {static_ip} allocated successfully.")
-                    except lightsail_client.exceptions.InvalidInputException as e:
-                        if "already in use" in str(e):
-                            self.notify(f"Static IP {static_ip_name} already exists. Proceeding to attach...")
-                        else:
-                            raise
+                    if self.addresses.by_name("lightsail", static_ip_name, *location):
+                        self.notify(f"Static IP {static_ip_name} already exists. Proceeding to attach...")
+                    else:
+                        try:
+                            self.notify(f"Allocating a new static IP: {static_ip_name}...")
+                            response = lightsail_client.allocate_static_ip(staticIpName=static_ip_name)
+                            static_ip = response["staticIp"]["ipAddress"]
+                            self.notify(f"New Static IP {static_ip} allocated successfully.")
+                        except lightsail_client.exceptions.InvalidInputException as e:
+                            if "already in use" in str(e):
+                                self.notify(f"Static IP {static_ip_name} already exists. Proceeding to attach...")
+                            else:
+                                raise
 
                     self.notify(f"Attaching Static IP {static_ip_name} to {instance_id}...")
                     lightsail_client.attach_static_ip(
@@ -841,16 +2606,13 @@ class AwsStatusApp(App):
                     self.notify(f"Static IP {static_ip_name} successfully attached to {instance_id}.")
                 else:
                     self.notify("Checking for existing Elastic IPs...")
-                    addresses = ec2_client.describe_addresses()["Addresses"]
-                    detached_ip = None
+                    attached = self.addresses.by_instance("ec2", instance_id, *location)
+                    if attached:
+                        self.notify(f"Elastic IP {attached[0].ip} is already attached to {instance_id}.")
+                        return
 
-                    for address in addresses:
-                        if "InstanceId" not in address: 
-                            detached_ip = address["PublicIp"]
-                            break
-                        elif address.get("InstanceId") == instance_id:
-                            self.notify(f"Elastic IP {address['PublicIp']} is already attached to {instance_id}.")
-                            return
+                    free = self.addresses.free("ec2", *location)
+                    detached_ip = free[0].ip if free else None
 
                     if detached_ip:
                         self.notify(f"Found a detached Elastic IP: {detached_ip}. Attaching it to {instance_id}...")
@@ -868,79 +2630,89 @@ class AwsStatusApp(App):
                             self.notify(f"Elastic IP {elastic_ip} created and attached to EC2 instance {instance_id}.")
                         except ec2_client.exceptions.ClientError as e:
                             if "AddressLimitExceeded" in str(e):
-                                self.notify("Elastic IP limit exceeded. Unable to allocate a new IP.")
+                                raise RuntimeError("Elastic IP limit exceeded. Unable to allocate a new IP.") from e
                             else:
                                 raise
 
 
             elif action == "attach":
-                if instance_id.startswith("i-"):
+                if key.kind == "ec2":
                     try:
-                        ec2_client.describe_addresses(PublicIps=[ip])
+                        if not self.addresses.by_ip("ec2", ip, *location):
+                            ec2_client.describe_addresses(PublicIps=[ip])
                         ec2_client.associate_address(InstanceId=instance_id, PublicIp=ip)
                         self.notify(f"Elastic IP {ip} attached to EC2 instance {instance_id}.")
                     except ec2_client.exceptions.ClientError as e:
                         if "InvalidIPAddress" in str(e):
-                            self.notify(f"Elastic IP {ip} does not exist.")
+                            raise RuntimeError(f"Elastic IP {ip} does not exist.") from e
                         else:
                             raise
-                elif instance_id in self.LIGHTSAIL_INSTANCES:
+                elif key.kind == "lightsail":
                     try:
-                        lightsail_client.get_static_ip(staticIpName=ip)
+                        static_ip = self.addresses.by_name("lightsail", ip, *location) or self.addresses.by_ip("lightsail", ip, *location)
+                        if static_ip:
+                            ip = static_ip.name
+                        else:
+                            lightsail_client.get_static_ip(staticIpName=ip)
                         lightsail_client.attach_static_ip(
                             staticIpName=ip, instanceName=instance_id
                         )
                         self.notify(f"Static IP {ip} attached to Lightsail instance {instance_id}.")
                     except lightsail_client.exceptions.ClientError as e:
                         if "NotFoundException" in str(e):
-                            self.notify(f"Static IP {ip} does not exist.")
+                            raise RuntimeError(f"Static IP {ip} does not exist.") from e
                         else:
                             raise
 
             elif action == "detach":
-                if instance_id.startswith("i-"):
-                    try:
-                        self.notify(f"Detaching Elastic IP from EC2 instance {instance_id}...")
-                        self.detach_elastic_ip_by_instance(instance_id=instance_id)  
-                    except Exception as e:
-                        self.notify(f"Error during detachment of Elastic IP from EC2 instance {instance_id}: {str(e)}")
+                if key.kind == "ec2":
+                    self.notify(f"Detaching Elastic IP from EC2 instance {instance_id}...")
+                    self.detach_elastic_ip_by_instance(key)
 
-                elif instance_id in self.LIGHTSAIL_INSTANCES:  
-                    try:
-                        self.detach_static_ip_by_instance(instance_name=instance_id)
-                        self.notify(f"Static IP successfully detached from Lightsail instance {instance_id}.")
-                    except Exception as e:
-                        self.notify(f"Error during detachment of Static IP from Lightsail instance {instance_id}: {str(e)}")
+                elif key.kind == "lightsail":
+                    self.detach_static_ip_by_instance(key)
+                    self.notify(f"Static IP successfully detached from Lightsail instance {instance_id}.")
                     
         except Exception as e:
             self.notify(f"Error managing IP for {instance_id}: {str(e)}")
-
-    async def manage_port(self, instance_id: str, instance_type: str, port: int):
+            raise
+        finally:
+            if action in ("create_and_attach", "attach"):
+                self.addresses.invalidate(key.kind, *location)
+
+    @background_job("port")
+    def manage_port(self, key, instance_type: str, port: int):
+        instance_id = key.id
         try:
             protocol = "tcp"
             cidr_block = "0.0.0.0/0"
 
             if instance_type == "ec2":
-                security_groups = self.get_security_group_id(instance_id)
+                security_groups = self.get_security_group_id(key)
                 if security_groups:
-                    for sg_id in security_groups:
-                        self.add_ipv4_rule(sg_id, protocol, (port, port), cidr_block)  
+                    failed = [
+                        sg_id for sg_id in security_groups
+                        if not self.add_ipv4_rules(sg_id, protocol, [(port, port)], cidr_block, *self.location_of(key))
+                    ]
+                    if failed:
+                        raise RuntimeError(f"{len(failed)} security groups could not be updated")
                     self.notify(f"Port {port} rule added to EC2 instance {instance_id}.")
                 else:
                     self.notify(f"No security groups found for EC2 instance {instance_id}.")
             elif instance_type == "lightsail":
-                self.add_lightsail_ipv4_rule(instance_id, protocol, (port, port), cidr_block)
+                self.add_lightsail_ipv4_rule(key, protocol, (port, port), cidr_block)
                 self.notify(f"Port {port} rule added to Lightsail instance {instance_id}.")
             else:
                 self.notify(f"Unknown instance type for adding port rule: {instance_id}")
         except Exception as e:
             self.notify(f"Error adding port {port} for {instance_id}: {str(e)}")
+            raise
             
     async def create_ec2_instance(self, ami_id, instance_name, instance_type, key_name, volume_size):
         try:
             key_name = self.create_or_get_key_pair(key_name)
 
-            response = self.ec2_client.run_instances(
+            response = get_client("ec2").run_instances(
                 ImageId=ami_id,
                 InstanceType=instance_type,
                 MinCount=1,
@@ -970,16 +2742,16 @@ class AwsStatusApp(App):
             print(f"Error creating EC2 instance: {e}")
             return None
 
-    def launch_lightsail_instance(self, instance_name, selected_plan_id):
+    def launch_lightsail_instance(self, instance_name, selected_plan_id, region=None):
         try:
             blueprint_id = "ubuntu_20_04"  
             bundle_id = selected_plan_id
 
-            client = boto3.client("lightsail", region_name="ap-south-1")
+            client = get_client("lightsail", region)
             
             response = client.create_instances(
                 instanceNames=[instance_name],
-                availabilityZone="ap-south-1a",
+                availabilityZone=f"{client.meta.region_name}a",
                 blueprintId=blueprint_id,
                 bundleId=bundle_id, 
                 userData="""#!/bin/bash
@@ -996,48 +2768,55 @@ class AwsStatusApp(App):
 
     
     def display_instances(self, instances):
-        for child in self.instances_grid.children:
-            self.instances_grid.remove(child)
-
-        for index, (instance_id, name, state, public_ip, tags) in enumerate(instances):
-            tags_display = ", ".join(tags) if tags else "No Tags" 
-            content = (
-                f"Instance ID: {instance_id}\n"
-                f"Name: {name}\n"
-                f"State: {state}\n"
-                f"Public IP: {public_ip}\n"
-                f"Tags: {tags_display}"
+        # The table only renders the rows in view, and rows are reconciled
+        # by record key so a refresh only touches what actually changed.
+        table = self.instances_table
+        rows = {}
+        for instance in instances:
+            tags_display = ", ".join(instance.tags) if instance.tags else "No Tags"
+            key = instance.key
+            rows[key] = (
+                SELECTED_MARK if key in self.selected_ids else "",
+                instance.id, instance.name, instance.state, instance.public_ip,
+                instance.region, instance.account, tags_display,
             )
-            background_class = f"bg-color-{index % 6}"
-            box = Static(content, classes=f"instance-box {background_class}")
-            self.instances_grid.mount(box)
-
-            start_button = Button("Start", id=f"start-{instance_id}", classes="button-start")
-            stop_button = Button("Stop", id=f"stop-{instance_id}", classes="button-stop")
-            reboot_button = Button("Reboot", id=f"reboot-{instance_id}", classes="button-reboot")
-            tag_button = Button("Tag", id=f"tag-{instance_id}", classes="button-tag")
-            ip_button = Button("IP", id=f"ip-{instance_id}", classes="button-ip")
-            ssh_button = Button("SSH", id=f"ssh-{instance_id}")
-
-            box.mount(start_button)
-            box.mount(stop_button)
-            box.mount(reboot_button)
-            box.mount(tag_button)
-            box.mount(ip_button)
-            box.mount(ssh_button)
-            
-            if state == "running" or state == "available":
-                start_button.disabled = True
-                stop_button.disabled = False
-            else:
-                start_button.disabled = False
-                stop_button.disabled = True
 
-            ssh_button.disabled = state != "running"
-            ip_button.disabled = state != "running" 
-            tag_button.disabled = state != "running"
+        removed = self.displayed_rows.keys() - rows.keys()
+        # New rows can only be appended, so the table keeps the inventory
+        # order only while the rows it keeps are a prefix of it.
+        kept = [key for key in self.displayed_rows if key in rows]
+        in_order = kept == list(itertools.islice(rows, len(kept)))
+        cursor_key = None
+        if len(removed) > ROW_REMOVAL_REBUILD_THRESHOLD or not in_order:
+            # DataTable.remove_row re-indexes the whole table, so dropping
+            # many rows at once is cheaper as a clear and re-add. The cursor
+            # is put back on the same record afterwards.
+            selected = self.selected_instance()
+            cursor_key = selected.key if selected else None
+            table.clear()
+            self.displayed_rows = {}
+        else:
+            for key in removed:
+                table.remove_row(RowKey(key))
+
+        for key, row in rows.items():
+            displayed = self.displayed_rows.get(key)
+            if displayed is None:
+                table.add_row(*row, key=key)
+            elif displayed != row:
+                for column_key, old_value, new_value in zip(self.instance_column_keys, displayed, row):
+                    if old_value != new_value:
+                        table.update_cell(RowKey(key), column_key, new_value)
+
+        if cursor_key in rows:
+            table.move_cursor(row=table.get_row_index(RowKey(cursor_key)))
+        self.displayed_rows = rows
+        # Search only draws the matches, so selections outside them are kept
+        # for as long as the instance is still in the inventory.
+        self.selected_ids &= self.inventory.snapshot.by_key.keys()
+        self.update_action_bar()
+
 
-            print(f"Mounted SSH Button: ssh-{instance_id}") 
 if __name__ == "__main__":
     app = AwsStatusApp()
     app.run()
@@ -1,3 +1,4 @@
+import asyncio
 import boto3
 import time
 import os
@@ -16,47 +17,54 @@ ec2_client = boto3.client('ec2')
 LIGHTSAIL_INSTANCES = []
 LIGHTSAIL_DATABASES = []
 
+EC2_PAGE_SIZE = 200
+
 def fetch_running_ec2_instances():
-    response = ec2_client.describe_instances(
-        Filters=[{'Name': 'instance-state-name', 'Values': ['running', 'stopped']}]
+    paginator = ec2_client.get_paginator('describe_instances')
+    pages = paginator.paginate(
+        Filters=[{'Name': 'instance-state-name', 'Values': ['running', 'stopped']}],
+        PaginationConfig={'PageSize': EC2_PAGE_SIZE},
     )
-    instances = []
-    for reservation in response['Reservations']:
-        for instance in reservation['Instances']:
-            instance_id = instance['InstanceId']
-            instance_state = instance['State']['Name']
-            name = next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == 'Name'), 'N/A')
-            public_ip = instance.get('PublicIpAddress', 'N/A')
-            tags = [tag['Key'] for tag in instance.get('Tags', [])]
-            instances.append((instance_id, name, instance_state, public_ip, tags))
-    return instances
+    for response in pages:
+        instances = []
+        for reservation in response['Reservations']:
+            for instance in reservation['Instances']:
+                instance_id = instance['InstanceId']
+                instance_state = instance['State']['Name']
+                name = next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == 'Name'), 'N/A')
+                public_ip = instance.get('PublicIpAddress', 'N/A')
+                tags = [tag['Key'] for tag in instance.get('Tags', [])]
+                instances.append((instance_id, name, instance_state, public_ip, tags))
+        yield instances
 
 
 def fetch_lightsail_instances():
-    response = lightsail_client.get_instances()
-    instances = []
-    instance_names = []
-    for instance in response['instances']:
-        instance_name = instance['name']
-        instance_state = instance['state']['name']
-        public_ip = instance['publicIpAddress'] if 'publicIpAddress' in instance else 'N/A'
-        tags = [tag.get('key') for tag in instance.get('tags', []) if 'key' in tag] 
-        instances.append((instance_name, instance_name, instance_state, public_ip, tags))
-        instance_names.append(instance_name)
-    return instances, instance_names
+    paginator = lightsail_client.get_paginator('get_instances')
+    for response in paginator.paginate():
+        instances = []
+        instance_names = []
+        for instance in response['instances']:
+            instance_name = instance['name']
+            instance_state = instance['state']['name']
+            public_ip = instance['publicIpAddress'] if 'publicIpAddress' in instance else 'N/A'
+            tags = [tag.get('key') for tag in instance.get('tags', []) if 'key' in tag]
+            instances.append((instance_name, instance_name, instance_state, public_ip, tags))
+            instance_names.append(instance_name)
+        yield instances, instance_names
 
 
 def fetch_lightsail_databases():
-    response = lightsail_client.get_relational_databases()
-    instances = []
-    db_names = []
-    for db_instance in response['relationalDatabases']:
-        db_instance_id = db_instance['name']
-        db_instance_state = db_instance['state']
-        tags = [tag.get('key') for tag in db_instance.get('tags', []) if 'key' in tag]
-        instances.append((db_instance_id, db_instance_id, db_instance_state, 'N/A', tags))
-        db_names.append(db_instance_id)
-    return instances, db_names
+    paginator = lightsail_client.get_paginator('get_relational_databases')
+    for response in paginator.paginate():
+        instances = []
+        db_names = []
+        for db_instance in response['relationalDatabases']:
+            db_instance_id = db_instance['name']
+            db_instance_state = db_instance['state']
+            tags = [tag.get('key') for tag in db_instance.get('tags', []) if 'key' in tag]
+            instances.append((db_instance_id, db_instance_id, db_instance_state, 'N/A', tags))
+            db_names.append(db_instance_id)
+        yield instances, db_names
 
 def check_instance_ports(self, instance_name):
     try:
@@ -452,17 +460,28 @@ class AwsStatusApp(App):
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "show-all-button":
-            ec2_instances = fetch_running_ec2_instances()
-            lightsail_instances, self.LIGHTSAIL_INSTANCES = fetch_lightsail_instances()
-            lightsail_databases, self.LIGHTSAIL_DATABASES = fetch_lightsail_databases()
-
-            self.instances = [
-                *ec2_instances,
-                *lightsail_instances,
-                *lightsail_databases,
-            ]
-
-            self.display_instances(self.instances)
+            # The grid is cleared once, then each page only mounts its own
+            # rows instead of redrawing everything received so far.
+            await self.instances_grid.remove_children()
+            self.instances = []
+            for ec2_page in fetch_running_ec2_instances():
+                self.display_instances(ec2_page, len(self.instances))
+                self.instances.extend(ec2_page)
+                await asyncio.sleep(0)
+
+            self.LIGHTSAIL_INSTANCES = []
+            for lightsail_page, instance_names in fetch_lightsail_instances():
+                self.display_instances(lightsail_page, len(self.instances))
+                self.instances.extend(lightsail_page)
+                self.LIGHTSAIL_INSTANCES.extend(instance_names)
+                await asyncio.sleep(0)
+
+            self.LIGHTSAIL_DATABASES = []
+            for database_page, db_names in fetch_lightsail_databases():
+                self.display_instances(database_page, len(self.instances))
+                self.instances.extend(database_page)
+                self.LIGHTSAIL_DATABASES.extend(db_names)
+                await asyncio.sleep(0)
 
             
         elif event.button.id == "launch-lightsail-button":
@@ -1015,11 +1034,8 @@ class AwsStatusApp(App):
             print(f"Error creating Lightsail instance: {e}")
 
     
-    def display_instances(self, instances):
-        for child in self.instances_grid.children:
-            self.instances_grid.remove(child)
-
-        for index, (instance_id, name, state, public_ip, tags) in enumerate(instances):
+    def display_instances(self, instances, start=0):
+        for index, (instance_id, name, state, public_ip, tags) in enumerate(instances, start):
             tags_display = ", ".join(tags) if tags else "No Tags" 
             content = (
                 f"Instance ID: {instance_id}\n"